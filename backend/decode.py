@@ -1,11 +1,26 @@
 import base64
-from typing import List
+from typing import Callable, Dict, List, Tuple
 
+import numpy as np
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from backend.encode import CODEC_BATCH_LIMIT
+from backend.helper.id_map import get_item_id_map
+
 router = APIRouter()
 
+# Byte value -> positions of its set bits
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+# From this many bytes on, NumPy unpacks a bitmap faster than the table lookup
+NUMPY_MIN_BYTES = 16
+
+# Largest ID a delta or run wishlist may reach: a few bytes of either can name a
+# huge ID (or, for runs, a huge range of them), unlike lists and bitmaps
+MAX_DECODED_ID = 1 << 20
+# IDs fit in 32 bits, which LEB128 spreads over at most 5 bytes
+MAX_VARINT_BYTES = 5
+
 
 class GetDecodeRequest(BaseModel):
     data: str
@@ -15,30 +30,153 @@ class GetDecodeResponse(BaseModel):
     data: List[int]
 
 
+class GetDecodeBatchRequest(BaseModel):
+    data: List[str]
+
+
+class GetDecodeBatchResponse(BaseModel):
+    data: List[List[int]]
+
+
+def decode_base64(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s.encode("ascii") + b"=" * (-len(s) % 4))
+
+
 def decode_list(s: str) -> List[int]:
-    raw = base64.urlsafe_b64decode(s.encode("ascii") + b"=" * (-len(s) % 4))
+    raw = decode_base64(s)
     if not raw:
         return []
     return list(map(int, raw.decode("ascii").split(",")))
 
 
-def decode_bitmap(s: str) -> List[int]:
-    raw = base64.urlsafe_b64decode(s.encode("ascii") + b"=" * (-len(s) % 4))
+def decode_varints(raw: bytes) -> List[int]:
+    """Inverse of ``backend.encode.encode_varints``."""
+    values = []
+    value = shift = 0
+    for byte in raw:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            if shift >= 7 * MAX_VARINT_BYTES:
+                raise ValueError("Varint too long")
+        else:
+            values.append(value)
+            value = shift = 0
+    if shift:
+        raise ValueError("Truncated varint")
+    return values
+
+
+def decode_delta(s: str) -> List[int]:
     result = []
+    previous = -1
+    for gap in decode_varints(decode_base64(s)):
+        previous += gap + 1
+        if previous >= MAX_DECODED_ID:
+            raise ValueError("ID exceeds the ID range")
+        result.append(previous)
+    return result
+
+
+def decode_runs(s: str) -> List[int]:
+    values = decode_varints(decode_base64(s))
+    if len(values) % 2:
+        raise ValueError("Run without a length")
+    result: List[int] = []
+    previous_end = -1
+    for gap, extra in zip(values[::2], values[1::2]):
+        start = previous_end + gap + 1
+        previous_end = start + extra
+        if previous_end >= MAX_DECODED_ID:
+            raise ValueError("Run exceeds the ID range")
+        result.extend(range(start, previous_end + 1))
+    return result
+
+
+def bitmap_ids(raw: bytes) -> List[int]:
+    """Inverse of ``backend.encode.bitmap_bytes``."""
+    if len(raw) >= NUMPY_MIN_BYTES:
+        bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little")
+        return np.flatnonzero(bits).tolist()
+    result: List[int] = []
     for byte_index, byte in enumerate(raw):
-        for bit_index in range(8):
-            if byte & (1 << bit_index):
-                result.append(byte_index * 8 + bit_index)
+        if byte:
+            base = byte_index * 8
+            result.extend([base + bit for bit in _BYTE_BITS[byte]])
     return result
 
 
+def decode_bitmap(s: str) -> List[int]:
+    return bitmap_ids(decode_base64(s))
+
+
+def split_mapped(s: str) -> Tuple[int, str]:
+    """Split the rest of an ``M{version}.{inner}`` link into version and inner codec."""
+    version, sep, inner = s.partition(".")
+    if not sep or not version.isdigit() or inner[:1] == "M":
+        raise ValueError("Input invalid format")
+    return int(version), inner
+
+
+def decode_dense_ids(inner: str) -> List[int]:
+    """The dense IDs of an ``M`` link's inner codec, raise ValueError for IDs no map holds."""
+    dense_ids = decode_ids(inner)
+    if any(not 0 <= dense_id < MAX_DECODED_ID for dense_id in dense_ids):
+        raise ValueError("ID exceeds the ID range")
+    return dense_ids
+
+
+def decode_mapped(s: str) -> List[int]:
+    """Dense IDs of any map version, translated back to part IDs."""
+    version, inner = split_mapped(s)
+    return sorted(get_item_id_map(version).to_parts(decode_dense_ids(inner)).tolist())
+
+
+# Codec prefix -> decoder of the rest of the string, see backend/encode.py
+DECODERS: Dict[str, Callable[[str], List[int]]] = {
+    "B": decode_bitmap,
+    "L": decode_list,
+    "D": decode_delta,
+    "R": decode_runs,
+    "M": decode_mapped,
+}
+
+
+def decode_ids(data: str) -> List[int]:
+    """Decode a wishlist string of any codec, raise ValueError when it is invalid."""
+    if not data:
+        return []
+    decoder = DECODERS.get(data[0])
+    if decoder is None:
+        raise ValueError("Input invalid format")
+    return decoder(data[1:])
+
+
 @router.post("", response_model=GetDecodeResponse)
 def decode_data(req: GetDecodeRequest):
-    if not req.data:
-        return GetDecodeResponse(data=[])
-    if req.data[0] == "B":
-        return GetDecodeResponse(data=decode_bitmap(req.data[1:]))
-    elif req.data[0] == "L":
-        return GetDecodeResponse(data=decode_list(req.data[1:]))
-    else:
+    try:
+        return GetDecodeResponse(data=decode_ids(req.data))
+    except ValueError:
         raise HTTPException(status_code=400, detail="Input invalid format")
+
+
+@router.post("/batch", response_model=GetDecodeBatchResponse)
+def decode_data_batch(req: GetDecodeBatchRequest):
+    """Decode up to CODEC_BATCH_LIMIT wishlists, results in request order."""
+    if len(req.data) > CODEC_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400, detail=f"Too many wishlists. Max {CODEC_BATCH_LIMIT} per request."
+        )
+    # Saved wishlists repeat a lot, decode each distinct one once
+    decoded: Dict[str, List[int]] = {}
+    result = []
+    for index, data in enumerate(req.data):
+        if data not in decoded:
+            try:
+                decoded[data] = decode_ids(data)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400, detail=f"Input invalid format (wishlist {index})"
+                )
+        result.append(decoded[data])
+    return GetDecodeBatchResponse(data=result)
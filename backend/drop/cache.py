@@ -0,0 +1,89 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "4096"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class SearchResultCache:
+    """
+    Bounded LRU cache of search results for one drop table version.
+
+    Entries are keyed by the canonical bitmap encoding of a wishlist and hold the
+    result already JSON encoded, so a hit is sent without serializing anything. The
+    whole cache is dropped as soon as it is asked about a different version, so
+    results never outlive the drop table they were scored from. Sizes are the length
+    of key and body.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX_ENTRIES, max_bytes: int = SEARCH_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version: Optional[int] = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version: int) -> None:
+        if self.version != version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.size = 0
+            self.version = version
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, version: int, body: bytes) -> None:
+        size = len(key) + len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (body, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.version = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# One cache per FastAPI worker, shared by /drop/search and /drop/search/batch
+search_result_cache = SearchResultCache()
@@ -0,0 +1,310 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from backend.helper.helper_function import fetchall, fetchall_in
+from backend.helper.snapshot import Snapshot, load_or_build
+from database.schema import t_item_id_map, t_part_relic_best, t_relic_source_scores
+from database.utils.derived import PART_RELIC_BEST_SELECT, RELIC_SOURCE_SCORES_SELECT
+from database.utils.id_map import ID_MAP_QUERY, LATEST_VERSION_QUERY
+from database.utils.version import get_data_version
+
+BLUEPRINT_PARTS = ("Chassis", "Neuroptics", "Systems")
+ROTATIONS = ("A", "B", "C")
+
+# Lookups of build_drop_graph, {table} is the derived table or its fallback subquery
+PART_RELIC_QUERY = (
+    "SELECT prize, radiant, drop_rate, relic FROM {table} WHERE prize IN ({keys}) ORDER BY seq"
+)
+RELIC_SOURCE_QUERY = (
+    "SELECT relic, drop_rate, source, rotation FROM {table} WHERE relic IN ({keys}) ORDER BY seq"
+)
+
+
+def format_part_name(warframe_set: str, parts_name: str) -> str:
+    """Turn a prime_parts row into the prize name used by the drop tables."""
+    if parts_name in BLUEPRINT_PARTS:
+        return f"{warframe_set} Prime {parts_name} Blueprint"
+    return f"{warframe_set} Prime {parts_name}"
+
+
+def _frozen(values: List[Any], dtype) -> np.ndarray:
+    arr = np.asarray(values, dtype=dtype)
+    arr.flags.writeable = False
+    return arr
+
+
+@dataclass(frozen=True)
+class CooMatrix:
+    """
+    Read-only sparse matrix in coordinate form.
+
+    Entries are kept in drop table row order, so sums over them add up in the same
+    order (and to the same floats) as a row by row loop over the tables would.
+    """
+
+    rows: np.ndarray
+    cols: np.ndarray
+    data: np.ndarray
+    shape: Tuple[int, int]
+
+    @classmethod
+    def from_entries(cls, entries: List[Tuple[int, int, float]], shape: Tuple[int, int]) -> "CooMatrix":
+        rows, cols, data = zip(*entries) if entries else ((), (), ())
+        return cls(
+            _frozen(rows, np.int32), _frozen(cols, np.int32), _frozen(data, np.float64), shape
+        )
+
+    def rmatmat(self, x: np.ndarray) -> np.ndarray:
+        """Return ``x @ self`` for a dense matrix ``x`` with ``shape[0]`` columns."""
+        count, width = x.shape[0], self.shape[1]
+        index = (np.arange(count)[:, None] * width + self.cols).ravel()
+        weights = (x[:, self.rows] * self.data).ravel()
+        return np.bincount(index, weights=weights, minlength=count * width).reshape(count, width)
+
+
+@dataclass(frozen=True)
+class DropGraph:
+    """
+    Immutable part -> relic -> source graph built from one drop table version.
+
+    Prizes are numbered by their first appearance in ``relic_rewards`` so that
+    sorting prize indices reproduces the row order the search used to see.
+    Rotations are folded into the source axis as ``source * 3 + rotation``.
+
+    Parts are indexed by their dense ID of the latest ``item_id_map`` version, which
+    numbers unvaulted parts first and keeps the part bitsets short. Parts added after
+    that version follow it; without a map the dense ID is the part ID itself.
+
+    :ivar last_update: The ``last_update`` value the graph was built from.
+    :ivar map_version: The ``item_id_map`` version of the dense IDs, 0 without a map.
+    :ivar part_dense: prime_parts.id -> dense ID, -1 for parts the search ignores.
+    :ivar prizes: Prize names, indexed by prize index.
+    :ivar part_prize: Dense ID -> prize index, -1 for parts the search ignores.
+    :ivar available_parts: Little-endian bitset of the dense IDs of unvaulted parts
+        that drop from relics, laid out like the bitmaps of ``backend/encode.py``.
+    :ivar relics: Relic names, indexed by relic index.
+    :ivar sources: Source names, indexed by source index.
+    :ivar prize_relic: Prizes x relics drop rates, best refinement per relic.
+    :ivar relic_source: Relics x (source, rotation) summed drop rates.
+    :ivar relic_source_total: ``relic_source`` with the rotations summed per source.
+    """
+
+    last_update: int
+    map_version: int
+    part_dense: np.ndarray
+    prizes: Tuple[str, ...]
+    part_prize: np.ndarray
+    available_parts: np.ndarray
+    relics: Tuple[str, ...]
+    sources: Tuple[str, ...]
+    prize_relic: CooMatrix
+    relic_source: CooMatrix
+    relic_source_total: CooMatrix
+
+    def to_snapshot(self) -> Snapshot:
+        arrays = {
+            "part_dense": self.part_dense,
+            "part_prize": self.part_prize,
+            "available_parts": self.available_parts,
+        }
+        for name in ("prize_relic", "relic_source", "relic_source_total"):
+            matrix = getattr(self, name)
+            arrays.update(
+                {f"{name}.rows": matrix.rows, f"{name}.cols": matrix.cols, f"{name}.data": matrix.data}
+            )
+        meta = {
+            "last_update": self.last_update,
+            "map_version": self.map_version,
+            "prizes": self.prizes,
+            "relics": self.relics,
+            "sources": self.sources,
+            "shapes": {
+                name: getattr(self, name).shape
+                for name in ("prize_relic", "relic_source", "relic_source_total")
+            },
+        }
+        return Snapshot(arrays=arrays, meta=meta)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "DropGraph":
+        arrays, meta = snapshot.arrays, snapshot.meta
+
+        def matrix(name: str) -> CooMatrix:
+            return CooMatrix(
+                arrays[f"{name}.rows"],
+                arrays[f"{name}.cols"],
+                arrays[f"{name}.data"],
+                tuple(meta["shapes"][name]),
+            )
+
+        return cls(
+            last_update=meta["last_update"],
+            map_version=meta["map_version"],
+            part_dense=arrays["part_dense"],
+            prizes=tuple(meta["prizes"]),
+            part_prize=arrays["part_prize"],
+            available_parts=arrays["available_parts"],
+            relics=tuple(meta["relics"]),
+            sources=tuple(meta["sources"]),
+            prize_relic=matrix("prize_relic"),
+            relic_source=matrix("relic_source"),
+            relic_source_total=matrix("relic_source_total"),
+        )
+
+    def part_bitmap(self, ids: Iterable[int]) -> np.ndarray:
+        """Pack part IDs into a dense ID bitset, ignoring IDs the graph does not know."""
+        ids = np.fromiter(ids, dtype=np.int64)
+        return self.dense_bitmap(self.part_dense[ids[(ids >= 0) & (ids < len(self.part_dense))]])
+
+    def dense_bitmap(self, ids: Iterable[int]) -> np.ndarray:
+        """Pack dense IDs into a bitset, ignoring IDs past the graph's map."""
+        ids = np.fromiter(ids, dtype=np.int64)
+        bits = np.zeros(len(self.part_prize), dtype=bool)
+        bits[ids[(ids >= 0) & (ids < len(bits))]] = True
+        return np.packbits(bits, bitorder="little")
+
+    def filter_available(self, bitmap: np.ndarray) -> np.ndarray:
+        """AND a dense ID bitset with the unvaulted parts and return the dense IDs left."""
+        size = min(len(bitmap), len(self.available_parts))
+        hits = np.bitwise_and(bitmap[:size], self.available_parts[:size])
+        return np.flatnonzero(np.unpackbits(hits, bitorder="little"))
+
+
+def _index(names: Dict[str, int], name: str) -> int:
+    if name not in names:
+        names[name] = len(names)
+    return names[name]
+
+
+def build_drop_graph(last_update: int) -> DropGraph:
+    """Load every table the search needs once and index it by integer keys."""
+    available_sets = {
+        x[0]
+        for x in fetchall('SELECT warframe_set FROM vault_status WHERE vaulted = "0"')
+    }
+    part_names = {
+        part_id: format_part_name(warframe_set, parts_name)
+        for part_id, warframe_set, parts_name in fetchall(
+            "SELECT id, warframe_set, parts_name FROM prime_parts"
+        )
+        if warframe_set in available_sets
+    }
+
+    # Read the tables derived at ingest time, fall back to deriving them on the
+    # fly for databases ingested before they existed
+    derived = {
+        x[0]
+        for x in fetchall(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?, ?)",
+            [t_part_relic_best.name, t_relic_source_scores.name, t_item_id_map.name],
+        )
+    }
+    part_relic_best = (
+        t_part_relic_best.name
+        if t_part_relic_best.name in derived
+        else f"({PART_RELIC_BEST_SELECT})"
+    )
+    relic_source_scores = (
+        t_relic_source_scores.name
+        if t_relic_source_scores.name in derived
+        else f"({RELIC_SOURCE_SCORES_SELECT})"
+    )
+
+    prize_names: Dict[str, int] = {}
+    relic_names: Dict[str, int] = {}
+    prize_edges: List[Dict[int, float]] = []
+    names = sorted(set(part_names.values()))
+    if names:
+        query = PART_RELIC_QUERY.replace("{table}", part_relic_best)
+        for prize, _radiant, drop_rate, relic in fetchall_in(query, names):
+            prize_id = _index(prize_names, prize)
+            if prize_id == len(prize_edges):
+                prize_edges.append({})
+            prize_edges[prize_id][_index(relic_names, relic)] = drop_rate
+
+    source_names: Dict[str, int] = {}
+    source_entries: List[Tuple[int, int, float]] = []
+    relics = list(relic_names)
+    if relics:
+        query = RELIC_SOURCE_QUERY.replace("{table}", relic_source_scores)
+        for relic, drop_rate, source, rotation in fetchall_in(query, relics):
+            if rotation not in ROTATIONS:
+                logging.warning(
+                    f"DropGraph: skipping {relic} from {source}, unknown rotation {rotation!r}"
+                )
+                continue
+            slot = _index(source_names, source) * len(ROTATIONS) + ROTATIONS.index(rotation)
+            source_entries.append((relic_names[relic], slot, drop_rate))
+
+    map_version, dense_parts = 0, list(range(max(part_names, default=-1) + 1))
+    if t_item_id_map.name in derived:
+        latest = fetchall(LATEST_VERSION_QUERY)
+        if latest and latest[0][0] is not None:
+            map_version = latest[0][0]
+            dense_parts = [x[0] for x in fetchall(ID_MAP_QUERY, [map_version])]
+            mapped = set(dense_parts)
+            dense_parts += sorted(part_id for part_id in part_names if part_id not in mapped)
+
+    part_dense = np.full(max(dense_parts, default=-1) + 1, -1, dtype=np.int32)
+    part_prize = np.full(len(dense_parts), -1, dtype=np.int32)
+    for dense_id, part_id in enumerate(dense_parts):
+        part_dense[part_id] = dense_id
+        if part_id in part_names:
+            part_prize[dense_id] = prize_names.get(part_names[part_id], -1)
+    part_dense.flags.writeable = False
+    part_prize.flags.writeable = False
+
+    return DropGraph(
+        last_update=last_update,
+        map_version=map_version,
+        part_dense=part_dense,
+        prizes=tuple(prize_names),
+        part_prize=part_prize,
+        available_parts=_frozen(np.packbits(part_prize >= 0, bitorder="little"), np.uint8),
+        relics=tuple(relics),
+        sources=tuple(source_names),
+        prize_relic=CooMatrix.from_entries(
+            [
+                (prize_id, relic_id, drop_rate)
+                for prize_id, edges in enumerate(prize_edges)
+                for relic_id, drop_rate in edges.items()
+            ],
+            (len(prize_names), len(relic_names)),
+        ),
+        relic_source=CooMatrix.from_entries(
+            source_entries, (len(relic_names), len(source_names) * len(ROTATIONS))
+        ),
+        relic_source_total=CooMatrix.from_entries(
+            [(relic_id, slot // len(ROTATIONS), rate) for relic_id, slot, rate in source_entries],
+            (len(relic_names), len(source_names)),
+        ),
+    )
+
+
+# Simple in-process cache (per FastAPI worker), rebuilt when the data version moves
+_CACHE: Dict[str, Any] = {
+    "graph": None,  # type: Optional[DropGraph]
+}
+_LOCK = threading.Lock()
+
+
+def get_drop_graph() -> DropGraph:
+    """Return the drop graph for the current drop table, building it on first use."""
+    db_last = get_data_version()
+    graph = _CACHE["graph"]
+    if graph is not None and graph.last_update == db_last:
+        return graph
+    with _LOCK:
+        graph = _CACHE["graph"]
+        if graph is None or graph.last_update != db_last:
+            # One worker builds the graph per version, the others map its snapshot
+            snapshot = load_or_build(
+                "drop_graph", db_last, lambda: build_drop_graph(db_last).to_snapshot()
+            )
+            graph = DropGraph.from_snapshot(snapshot)
+            _CACHE["graph"] = graph
+    return graph
@@ -1,28 +1,24 @@
-from collections import defaultdict, namedtuple
-from typing import List, Iterable, TypeVar
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
+import anyio
+import numpy as np
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
-from database.schema import RewardTables
+from backend.decode import bitmap_ids, decode_base64, decode_dense_ids, decode_ids, split_mapped
+from backend.drop.cache import search_result_cache
+from backend.drop.graph import ROTATIONS, DropGraph, get_drop_graph
+from backend.encode import encode_bitmap
+from backend.helper.id_map import get_item_id_map
+from backend.helper.json_response import FastJSONResponse, dumps, timed_dumps
 
 router = APIRouter()
 
-from backend.helper.helper_function import fetchall
-
 T = TypeVar("T")
 
-
-def get_available_sets() -> list[str]:
-    return [
-        x[0]
-        for x in fetchall('SELECT warframe_set FROM vault_status WHERE vaulted = "0"')
-    ]
-
-
-def make_question_string(l: Iterable[T]) -> str:
-    return ",".join("?" for _ in l)
+# The result of a wishlist without unvaulted parts, JSON encoded like cached results
+EMPTY_RESULT = dumps({"relic_score": {}, "area_score": {}})
 
 
 class DropSearchService:
@@ -31,172 +27,287 @@ class DropSearchService:
     data from external sources, organizing drop information, and calculating scores
     for relics and source areas.
 
-    This class is designed for processing item drop data in a structured and efficient
-    manner. It provides methods to convert item data into specific formats, search for
-    item drops, calculate relic scores based on drop rates, and aggregate area-based
-    drop scores. The functionality is encapsulated into steps for easier adjustment
-    and extension.
+    All lookups run against the in-memory :class:`DropGraph`, which is built once per
+    drop table version, so a search does not touch the database. Wishlists are turned
+    into vectors over prizes and both score tables come from sparse matrix products
+    over the graph; Python only walks the hit entries to name them. Several wishlists
+    can be scored in one pass with :meth:`process_batch`.
 
     :ivar item_int_arr: A list of integers representing the item IDs to process.
     :type item_int_arr: List[int]
+    :ivar item_bitmap: The same IDs as a raw ``B`` bitmap from ``backend/encode.py``,
+        used instead of ``item_int_arr`` when given.
+    :type item_bitmap: Optional[bytes]
+    :ivar bitmap_version: The ``item_id_map`` version of the dense IDs in the bitmap
+        or list, 0 when they are part IDs. A bitmap of the graph's version is used as is.
+    :type bitmap_version: int
     """
 
-    def __init__(self, item_int_arr: List[int]) -> None:
+    def __init__(
+        self, item_int_arr: List[int], item_bitmap: Optional[bytes] = None, bitmap_version: int = 0
+    ) -> None:
         self.item_int_arr = item_int_arr
-
-    def process_search(self):
+        self.item_bitmap = item_bitmap
+        self.bitmap_version = bitmap_version
+
+    @classmethod
+    def from_encoded(cls, data: str) -> "DropSearchService":
+        """Build a search from an encoded wishlist, keeping bitmaps as bitmaps."""
+        if not data:
+            return cls([])
+        if data[0] == "B":
+            return cls([], decode_base64(data[1:]))
+        if data[0] == "M":
+            version, inner = split_mapped(data[1:])
+            if inner[:1] == "B":
+                return cls([], decode_base64(inner[1:]), version)
+            # Packed against the graph later, where IDs past its map are dropped
+            return cls(decode_dense_ids(inner), None, version)
+        return cls(decode_ids(data))
+
+    def is_empty(self) -> bool:
+        return not self.item_int_arr and not self.item_bitmap
+
+    def part_bitmap(self, graph: DropGraph) -> np.ndarray:
+        if self.item_bitmap:
+            if self.bitmap_version == graph.map_version:
+                return np.frombuffer(self.item_bitmap, dtype=np.uint8)
+            # A link from another numbering, translate it through its map version
+            ids = bitmap_ids(self.item_bitmap)
+            if self.bitmap_version:
+                ids = get_item_id_map(self.bitmap_version).to_parts(ids)
+            return graph.part_bitmap(ids)
+        if self.bitmap_version == graph.map_version:
+            return graph.dense_bitmap(self.item_int_arr)
+        ids = self.item_int_arr
+        if self.bitmap_version:
+            ids = get_item_id_map(self.bitmap_version).to_parts(ids)
+        return graph.part_bitmap(ids)
+
+    def process_search(self) -> bytes:
         # Empty input guard
-        if not self.item_int_arr:
-            return {"relic_score": {}, "area_score": {}}
-        # Step 1: Turn the item list (int) to an item list (str)
-        item_list = self.get_set_list(self.item_int_arr)
-        if not item_list:
-            return {"relic_score": {}, "area_score": {}}
+        if self.is_empty():
+            return EMPTY_RESULT
+        return self.process_batch([self])[0]
+
+    @classmethod
+    def process_batch(cls, services: List["DropSearchService"]) -> List[bytes]:
+        """
+        Scores many wishlists at once, sharing the graph and the matrix products.
+
+        Results are cached per drop table version, keyed by the bitmap encoding of the
+        wishlist's unvaulted parts, so equal wishlists are only scored once. Results are
+        JSON encoded once, when scored, and cached that way.
+
+        :param services: The searches to run.
+        :return: One JSON encoded ``{"relic_score", "area_score"}`` result per search, in order.
+        """
+        results = [EMPTY_RESULT for _ in services]
+        pending = [i for i, service in enumerate(services) if not service.is_empty()]
+        if not pending:
+            return results
+        graph = get_drop_graph()
+        # Step 1: Turn the item lists to their unvaulted parts and check the cache
+        misses: Dict[str, Tuple[np.ndarray, List[int]]] = {}
+        for i in pending:
+            part_ids = cls.get_set_list(graph, services[i].part_bitmap(graph))
+            if not part_ids.size:
+                continue
+            key = encode_bitmap(part_ids.tolist())
+            cached = search_result_cache.get(key, graph.last_update)
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses.setdefault(key, (part_ids, []))[1].append(i)
+        if not misses:
+            return results
+        wishlists = np.zeros((len(misses), len(graph.prizes)))
+        for row, (part_ids, _) in enumerate(misses.values()):
+            wishlists[row, graph.part_prize[part_ids]] = 1.0
         # Step 2: Search item drop
-        relic_list = self.search_item_drop(item_list)
-        if not relic_list:
-            return {"relic_score": {}, "area_score": {}}
+        hits = cls.search_item_drop(graph, wishlists)
         # Step 3: Get relics score
-        relic_score_list = self.get_relic_score_list(relic_list)
-        if not relic_score_list:
-            return {"relic_score": {}, "area_score": {}}
+        relic_scores = graph.prize_relic.rmatmat(wishlists)
         # Step 4: Get relic drops
-        area_score_list = self.get_area_score_list(relic_score_list)
+        relics = np.zeros((len(misses), len(graph.relics)))
+        rows, entries = np.nonzero(hits)
+        relics[rows, graph.prize_relic.cols[entries]] = 1.0
+        slot_scores = graph.relic_source.rmatmat(relics)
+        source_scores = graph.relic_source_total.rmatmat(relics)
         # Step 5: Organize data
-        return {"relic_score": relic_score_list, "area_score": area_score_list}
+        for row, (key, (_, indices)) in enumerate(misses.items()):
+            relic_list = np.flatnonzero(hits[row])
+            if relic_list.size:
+                result = timed_dumps({
+                    "relic_score": cls.get_relic_score_list(graph, relic_scores[row], relic_list),
+                    "area_score": cls.get_area_score_list(
+                        graph, relics[row], slot_scores[row], source_scores[row]
+                    ),
+                })
+            else:
+                result = EMPTY_RESULT
+            search_result_cache.put(key, graph.last_update, result)
+            for i in indices:
+                results[i] = result
+        return results
 
     @staticmethod
-    def get_set_list(lst: List[int]) -> list[str]:
-        """
-        Generates a list of part names
-        from a database query based on the given list of IDs.
-
-        :param lst: A list of integers representing the IDs to be used in the query.
-        :type lst: List[int]
-        :return: A list of formatted strings combining valid part names.
-        :rtype: list[str]
+    def get_set_list(graph: DropGraph, bitmap: np.ndarray) -> np.ndarray:
         """
+        Turns a dense ID bitset into the unvaulted parts the search can use.
 
-        place_holder = make_question_string(lst)
-        query = f"SELECT warframe_set, parts_name FROM prime_parts WHERE id IN ({place_holder})"
-        result = [x for x in fetchall(query, lst) if x[0] in get_available_sets()]
+        Vaulted and unknown parts are masked out with a single AND against the
+        graph's bitset of available parts.
 
-        stringify = [
-            (
-                f"{x[0]} Prime {x[1]} Blueprint"
-                if x[1] in ["Chassis", "Neuroptics", "Systems"]
-                else f"{x[0]} Prime {x[1]}"
-            )
-            for x in result
-        ]
-
-        return stringify
+        :param graph: The drop graph of the current drop table.
+        :param bitmap: Dense IDs (see :class:`DropGraph`) packed as a little-endian bitset.
+        :return: The sorted dense IDs left after the mask.
+        :rtype: np.ndarray
+        """
+        return graph.filter_available(bitmap)
 
     @staticmethod
-    def search_item_drop(lst: List[str]) -> dict:
+    def search_item_drop(graph: DropGraph, wishlists: np.ndarray) -> np.ndarray:
         """
-        Searches and organizes items with their drop rates and relics.
-
-        This method processes the given list of item data, where each entry
-        contains information about a prize, its relic, drop rate, and whether
-        it is radiant. It organizes the data into a dictionary where each key
-        is a prize, and the value is a list of unique relics and their associated
-        drop rates for that prize. If a new entry has the same relic but a higher
-        drop rate, it replaces the existing entry for that relic.
-
-        :param lst: A list of tuples in the format (prize: str, radiant: str,
-            drop_rate: float, relic: str), where each tuple contains an item's
-            details to be processed.
-        :return: A dictionary where each key corresponds to a prize (str), and the
-            value is a list of named tuples (relic: str, radiant: str, drop_rate: float)
-            containing details about associated relics and their respective drop rates.
+        Finds the prize -> relic entries hit by each wishlist.
+
+        Only the refinement with the highest drop rate is kept per relic, this is
+        resolved when the graph is built.
+
+        :param graph: The drop graph of the current drop table.
+        :param wishlists: 0/1 vectors over ``graph.prizes``, one wishlist per row.
+        :return: A boolean mask over ``graph.prize_relic`` entries, one row per wishlist.
         """
-        query_result = fetchall(
-            f"SELECT prize, radiant, drop_rate, relic FROM relic_rewards WHERE prize IN ({make_question_string(lst)})",
-            lst,
-        )
-        ItemDropRate = namedtuple("ItemDropRate", ["relic", "radiant", "drop_rate"])
-        item_drop = defaultdict(list)
-
-        for prize, radiant, drop_rate, relic in query_result:
-            reward = ItemDropRate(relic, radiant, drop_rate)
-            existing_relics = [r.relic for r in item_drop[prize]]
-            if relic not in existing_relics:
-                item_drop[prize].append(reward)
-            else:
-                for i, existing_reward in enumerate(item_drop[prize]):
-                    if (
-                        existing_reward.relic == relic
-                        and drop_rate > existing_reward.drop_rate
-                    ):
-                        item_drop[prize][i] = reward
-                        break
-        return dict(item_drop)
+        return wishlists[:, graph.prize_relic.rows] > 0
 
     @staticmethod
-    def get_relic_score_list(item_drop_list: dict):
+    def get_relic_score_list(graph: DropGraph, relic_scores: np.ndarray, item_drop_list: np.ndarray):
         """
-        Processes a list of item drops to calculate and organize relic scores and their associated
-        item list. Each item drop rate is used to increment the score of its corresponding relic,
-        grouping items by their relics in a structured dictionary.
+        Groups the wanted items by relic, next to the relic's score.
 
-        :param item_drop_list: A dictionary representing item drops where keys are item names
-            and values are lists of drop rate objects.
+        :param graph: The drop graph of the current drop table.
+        :param relic_scores: The wishlist times the prizes x relics matrix.
+        :param item_drop_list: Indices of the ``graph.prize_relic`` entries the wishlist hits.
         :return: A dictionary containing relic names as keys. Each relic key has a value of another
             dictionary that includes a 'score' field for the relic's accumulated score, and an
             'item_list' field with some corresponding items. (need remodel) 1
         """
+        matrix = graph.prize_relic
+        relic_scores = relic_scores.tolist()
         relic_list = {}
-        for item_name, drop_rates in item_drop_list.items():
-            for drop_rate in drop_rates:
-                relic_name = drop_rate.relic
-                if relic_name not in relic_list:
-                    relic_list[relic_name] = {"score": 0, "item_list": []}
-                relic_list[relic_name]["score"] += drop_rate.drop_rate
-                relic_list[relic_name]["item_list"].append(item_name)
+        for prize, relic in zip(
+            matrix.rows[item_drop_list].tolist(), matrix.cols[item_drop_list].tolist()
+        ):
+            relic_name = graph.relics[relic]
+            if relic_name not in relic_list:
+                relic_list[relic_name] = {"score": relic_scores[relic], "item_list": []}
+            relic_list[relic_name]["item_list"].append(graph.prizes[prize])
 
         return relic_list
 
     @staticmethod
-    def get_area_score_list(item_score_list: dict) -> dict:
+    def get_area_score_list(
+        graph: DropGraph, relics: np.ndarray, slot_scores: np.ndarray, source_scores: np.ndarray
+    ) -> dict:
         """
         Calculates and returns a dictionary mapping source areas to their respective drop
         scores and categorized rotation details based on relic drop rates.
 
-        :param item_score_list: A dictionary where keys are item names and values are their scores.
-        :type item_score_list: dict
+        :param graph: The drop graph of the current drop table.
+        :param relics: A 0/1 vector of the relics that drop a wanted item.
+        :param slot_scores: ``relics`` times the relics x (source, rotation) matrix.
+        :param source_scores: ``relics`` times the relics x source matrix.
         :return: A dictionary mapping each source area to its cumulative drop score and detailed
                  rotation-related information, including scores and lists of relics per rotation.
         :rtype: dict
         """
+        matrix = graph.relic_source
+        hits = np.flatnonzero(relics[matrix.rows])
+
+        slots = matrix.cols[hits]
+        sources, rotations = np.divmod(slots, len(ROTATIONS))
+        slot_scores, source_scores = slot_scores.tolist(), source_scores.tolist()
+
         area_list = {}
-        for table in RewardTables.TABLES:
-            relics = list(item_score_list.keys())
-            query = f"SELECT prize, drop_rate, source, rotation FROM {table.__tablename__} WHERE prize IN ({make_question_string(relics)})"
-            for prize, drop_rate, source, rotation in fetchall(query, relics):
-                if source not in area_list:
-                    area_list[source] = {
-                        "score": 0,
-                        "A": {"score": 0, "relic_list": []},
-                        "B": {"score": 0, "relic_list": []},
-                        "C": {"score": 0, "relic_list": []},
-                    }
-
-                rotations = rotation.split(" ")[-1]
-                area_list[source]["score"] += drop_rate
-                area_list[source][rotations]["score"] += drop_rate
-                area_list[source][rotations]["relic_list"].append(prize)
+        for relic, slot, source, rotation in zip(
+            matrix.rows[hits].tolist(), slots.tolist(), sources.tolist(), rotations.tolist()
+        ):
+            source_name = graph.sources[source]
+            if source_name not in area_list:
+                area_list[source_name] = {
+                    "score": source_scores[source],
+                    "A": {"score": 0, "relic_list": []},
+                    "B": {"score": 0, "relic_list": []},
+                    "C": {"score": 0, "relic_list": []},
+                }
+
+            area = area_list[source_name][ROTATIONS[rotation]]
+            area["score"] = slot_scores[slot]
+            area["relic_list"].append(graph.relics[relic])
         return area_list
 
 
+SEARCH_BATCH_LIMIT = int(os.getenv("SEARCH_BATCH_LIMIT", "100"))
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+
+# Searches decode wishlists, read SQLite and score on worker threads, at most SEARCH_MAX_CONCURRENCY
+# at a time, so a slow search never blocks the event loop of the worker
+_search_limiter = anyio.CapacityLimiter(SEARCH_MAX_CONCURRENCY)
+
+
+async def run_search(func: Callable[..., T], *args: Any) -> T:
+    return await anyio.to_thread.run_sync(func, *args, limiter=_search_limiter)
+
+
 class SearchRequest(BaseModel):
-    data: List[int]
+    data: Union[List[int], str]
+
+
+class BatchSearchRequest(BaseModel):
+    data: List[Union[List[int], str]]
+
+
+def _make_service(data: Union[List[int], str]) -> DropSearchService:
+    if isinstance(data, str):
+        return DropSearchService.from_encoded(data)
+    return DropSearchService(data)
 
 
 @router.post("")
-async def search_drop(request: SearchRequest) -> JSONResponse:
+async def search_drop(request: SearchRequest) -> FastJSONResponse:
 
     try:
-        return JSONResponse(DropSearchService(request.data).process_search())
+        # Decoding a wishlist is CPU work too, it runs on the search thread as well
+        return await run_search(
+            lambda: FastJSONResponse(_make_service(request.data).process_search())
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/batch")
+async def search_drop_batch(request: BatchSearchRequest) -> FastJSONResponse:
+    """Score up to SEARCH_BATCH_LIMIT wishlists in one pass, keyed by request index."""
+    if len(request.data) > SEARCH_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many wishlists. Max {SEARCH_BATCH_LIMIT} per request.",
+        )
+    try:
+        def search() -> FastJSONResponse:
+            services = [_make_service(data) for data in request.data]
+            results = DropSearchService.process_batch(services)
+            # The results are JSON already, only the object around them is written here
+            return FastJSONResponse(
+                b"{" + b",".join(b'"%d":%s' % (i, result) for i, result in enumerate(results)) + b"}"
+            )
+
+        return await run_search(search)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/cache")
+def search_cache_stats() -> FastJSONResponse:
+    """Hit/miss/eviction counters of this worker's search result cache."""
+    return FastJSONResponse(search_result_cache.stats())
@@ -1,12 +1,21 @@
 import base64
 import math
-from typing import List
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from fastapi import APIRouter
+import numpy as np
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from backend.helper.id_map import ItemIdMap, get_latest_item_id_map
+
 router = APIRouter()
 
+CODEC_BATCH_LIMIT = int(os.getenv("CODEC_BATCH_LIMIT", "10000"))
+
+# From this many IDs on, NumPy packs a bitmap faster than a Python loop
+NUMPY_MIN_IDS = 64
+
 
 class GetEncodeRequest(BaseModel):
     data: List[int]
@@ -16,37 +25,133 @@ class GetEncodeResponse(BaseModel):
     data: str
 
 
-def encode_bitmap(int_arr: List[int]) -> str:
-    if not int_arr:
-        return ""
-    if any(num < 0 for num in int_arr):
-        raise ValueError("All numbers must be non-negative")
-    max_val = max(int_arr)
-    bit_len = max_val + 1
-    byte_len = math.ceil(bit_len / 8)
-    bit_array = bytearray(byte_len)
+class GetEncodeBatchRequest(BaseModel):
+    data: List[List[int]]
+
+
+class GetEncodeBatchResponse(BaseModel):
+    data: List[str]
+
 
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def bitmap_bytes(int_arr: Sequence[int]) -> bytes:
+    """Pack non-negative IDs into a little-endian bitmap, bit ``id % 8`` of byte ``id // 8``."""
+    if len(int_arr) >= NUMPY_MIN_IDS:
+        ids = np.asarray(int_arr, dtype=np.int64)
+        if ids.min() < 0:
+            raise ValueError("All numbers must be non-negative")
+        bits = np.zeros(int(ids.max()) + 1, dtype=bool)
+        bits[ids] = True
+        return np.packbits(bits, bitorder="little").tobytes()
+
+    if min(int_arr) < 0:
+        raise ValueError("All numbers must be non-negative")
+    bit_array = bytearray((max(int_arr) >> 3) + 1)
     for num in int_arr:
-        byte_index = num // 8
-        bit_index = num % 8
-        bit_array[byte_index] |= (1 << bit_index)
+        bit_array[num >> 3] |= 1 << (num & 7)
+    return bytes(bit_array)
 
-    return "B" + base64.urlsafe_b64encode(bit_array).decode("ascii").rstrip("=")
+
+def encode_bitmap(int_arr: Sequence[int]) -> str:
+    if not len(int_arr):
+        return ""
+    return "B" + _b64(bitmap_bytes(int_arr))
 
 
 def encode_list(int_arr: List[int]) -> str:
     joined = ",".join(map(str, int_arr))
-    return "L" + base64.urlsafe_b64encode(joined.encode("ascii")).decode("ascii").rstrip("=")
+    return "L" + _b64(joined.encode("ascii"))
+
+
+def encode_varints(values: Iterable[int]) -> bytes:
+    """LEB128: 7 bits per byte, low groups first, high bit set on all but the last byte."""
+    out = bytearray()
+    for value in values:
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def encode_delta(int_arr: List[int]) -> str:
+    """Sorted unique IDs as varint gaps: the first ID, then ``id - previous - 1``."""
+    gaps = [b - a - 1 for a, b in zip([-1] + int_arr, int_arr)]
+    return "D" + _b64(encode_varints(gaps))
+
+
+def encode_runs(int_arr: List[int]) -> str:
+    """Sorted unique IDs as varint ``(gap, length - 1)`` pairs of consecutive runs."""
+    pairs: List[int] = []
+    previous_end = -1  # last ID of the previous run
+    start = None
+    for i, num in enumerate(int_arr):
+        if start is None:
+            start = num
+        if i + 1 == len(int_arr) or int_arr[i + 1] != num + 1:
+            pairs += [start - previous_end - 1, num - start]
+            previous_end, start = num, None
+    return "R" + _b64(encode_varints(pairs))
+
+
+def _shortest_encoding(arr: List[int]) -> str:
+    candidates = [encode_list(arr), encode_delta(arr), encode_runs(arr)]
+    shortest = min(candidates, key=len)
+
+    # 選最短的方案, ties go to the bitmap, then the older codec. The bitmap length
+    # is known upfront, so a sparse list with a high ID never allocates one
+    bitmap_len = 1 + math.ceil(math.ceil((arr[-1] + 1) / 8) * 4 / 3)
+    if bitmap_len <= len(shortest):
+        return encode_bitmap(arr)
+    return shortest
+
+
+def encode_ids(int_arr: List[int], id_map: Optional[ItemIdMap] = None) -> str:
+    """
+    Encode IDs with whichever codec gives the shortest string.
+
+    With an ``id_map`` the dense IDs are encoded too, as ``M{version}.{codec}``, and
+    win when shorter. IDs the map does not know keep the raw encoding.
+    """
+    arr = sorted(set(int_arr))  # 去重 + 排序
+    if not arr:
+        return ""
+    if arr[0] < 0:
+        raise ValueError("All numbers must be non-negative")
+    shortest = _shortest_encoding(arr)
+    dense = id_map.to_dense(arr) if id_map is not None else None
+    if dense is not None:
+        mapped = f"M{id_map.version}." + _shortest_encoding(sorted(dense.tolist()))
+        if len(mapped) < len(shortest):
+            return mapped
+    return shortest
 
 
 @router.post("", response_model=GetEncodeResponse)
 def encode_data(req: GetEncodeRequest):
-    arr = sorted(set(req.data))  # 去重 + 排序
-    b64_bitmap = encode_bitmap(arr)
-    b64_list = encode_list(arr)
-
-    # 選最短的方案
-    if len(b64_list) < len(b64_bitmap):
-        return GetEncodeResponse(data=b64_list)
-    else:
-        return GetEncodeResponse(data=b64_bitmap)
+    return GetEncodeResponse(data=encode_ids(req.data, get_latest_item_id_map()))
+
+
+@router.post("/batch", response_model=GetEncodeBatchResponse)
+def encode_data_batch(req: GetEncodeBatchRequest):
+    """Encode up to CODEC_BATCH_LIMIT wishlists, results in request order."""
+    if len(req.data) > CODEC_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400, detail=f"Too many wishlists. Max {CODEC_BATCH_LIMIT} per request."
+        )
+    id_map = get_latest_item_id_map()
+    # Saved wishlists repeat a lot, encode each distinct one once
+    encoded: Dict[Tuple[int, ...], str] = {}
+    result = []
+    for index, int_arr in enumerate(req.data):
+        key = tuple(int_arr)
+        if key not in encoded:
+            try:
+                encoded[key] = encode_ids(int_arr, id_map)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"{e} (wishlist {index})")
+        result.append(encoded[key])
+    return GetEncodeBatchResponse(data=result)
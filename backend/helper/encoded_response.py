@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from backend.helper.json_response import dumps
+from backend.helper.snapshot import Snapshot
+
+try:
+    import zstandard
+except ImportError:  # optional, zstd is only offered when installed
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+# Hex digits of the body hash in ETags
+ETAG_HASH_LENGTH = 16
+
+# Preferred first, identity is always available
+ENCODINGS = ("zstd", "gzip", "identity")
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """
+    A JSON payload serialized once, in every content coding we can serve.
+
+    :ivar etag: Strong ETag of the payload, without quotes.
+    :ivar bodies: Content coding -> encoded bytes.
+    """
+
+    etag: str
+    bodies: Dict[str, bytes]
+
+    def to_snapshot(self) -> Snapshot:
+        return Snapshot(blobs=self.bodies, meta={"etag": self.etag})
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "EncodedBody":
+        return cls(etag=snapshot.meta["etag"], bodies=dict(snapshot.blobs))
+
+    def etag_for(self, encoding: str) -> str:
+        """Strong validators must differ per content coding."""
+        if encoding == "identity":
+            return f'"{self.etag}"'
+        return f'"{self.etag}-{encoding}"'
+
+
+def encode_json(payload: Any, etag: str) -> EncodedBody:
+    """
+    Serialize ``payload`` like the app's JSON responses and compress it.
+
+    The ETag is ``etag`` followed by a hash of the JSON, so a rebuild that serializes
+    other bytes never answers a revalidation of the old ones with a 304.
+    """
+    body = dumps(payload)
+    etag = f"{etag}-{hashlib.sha256(body).hexdigest()[:ETAG_HASH_LENGTH]}"
+    bodies = {
+        "identity": body,
+        # mtime=0 keeps the bytes, and so the ETag, stable across rebuilds
+        "gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+    }
+    if zstandard is not None:
+        bodies["zstd"] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return EncodedBody(etag=etag, bodies=bodies)
+
+
+def pick_encoding(accept_encoding: Optional[str], available) -> str:
+    """Return the preferred content coding the client accepts, else ``identity``."""
+    accepted: Dict[str, float] = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+def etag_matches(if_none_match: Optional[str], body: EncodedBody) -> bool:
+    """Weak comparison of ``If-None-Match`` against any coding of ``body``."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags:
+        return True
+    return any(body.etag_for(encoding) in tags for encoding in body.bodies)
+
+
+def encoded_response(request: Request, body: EncodedBody, cache_control: str = "no-cache") -> Response:
+    """Answer ``request`` from pre-encoded bytes, with a 304 when the ETag matches."""
+    encoding = pick_encoding(request.headers.get("accept-encoding"), body.bodies)
+    headers = {
+        "ETag": body.etag_for(encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), body):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=body.bodies[encoding], media_type="application/json", headers=headers
+    )
@@ -1,10 +1,10 @@
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Sequence
 
 import dotenv
 
 dotenv.load_dotenv()
 
-from database.db_router import select
+from database.db_router import select, select_in
 
 
 def fetchall(query: str, params: Optional[Any] = None) -> List[tuple]:
@@ -14,3 +14,8 @@ def fetchall(query: str, params: Optional[Any] = None) -> List[tuple]:
     if not isinstance(params, (list, tuple)):
         params = [params]
     return select(query, list(params))
+
+
+def fetchall_in(query: str, keys: Sequence[Any]) -> List[tuple]:
+    # Bulk key lookup, see database.db_router.select_in
+    return select_in(query, keys)
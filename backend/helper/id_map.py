@@ -0,0 +1,86 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from database.utils.id_map import load_item_id_map, load_latest_item_id_map
+from database.utils.version import get_data_version
+
+
+@dataclass(frozen=True)
+class ItemIdMap:
+    """
+    One version of the dense item ID numbering (``item_id_map``).
+
+    :ivar version: The map version, carried in ``M`` wishlist links.
+    :ivar part_ids: Dense ID -> prime_parts.id.
+    :ivar dense_ids: prime_parts.id -> dense ID, -1 for parts the version lacks.
+    """
+
+    version: int
+    part_ids: np.ndarray
+    dense_ids: np.ndarray
+
+    @classmethod
+    def from_part_ids(cls, version: int, part_ids: Iterable[int]) -> "ItemIdMap":
+        part_ids = np.fromiter(part_ids, dtype=np.int64)
+        dense_ids = np.full(int(part_ids.max(initial=-1)) + 1, -1, dtype=np.int64)
+        dense_ids[part_ids] = np.arange(len(part_ids))
+        part_ids.flags.writeable = False
+        dense_ids.flags.writeable = False
+        return cls(version, part_ids, dense_ids)
+
+    def to_dense(self, part_ids: Iterable[int]) -> Optional[np.ndarray]:
+        """Dense IDs of ``part_ids``, None when one of them is not in this version."""
+        part_ids = np.fromiter(part_ids, dtype=np.int64)
+        if part_ids.size and (part_ids.min() < 0 or part_ids.max() >= len(self.dense_ids)):
+            return None
+        dense = self.dense_ids[part_ids]
+        return None if (dense < 0).any() else dense
+
+    def to_parts(self, dense_ids: Iterable[int]) -> np.ndarray:
+        """Part IDs of ``dense_ids``, dropping IDs outside of this version."""
+        dense_ids = np.fromiter(dense_ids, dtype=np.int64)
+        return self.part_ids[dense_ids[(dense_ids >= 0) & (dense_ids < len(self.part_ids))]]
+
+
+# Versions never change once written, so they are cached for good; the latest
+# version is looked up again whenever the data version moves
+_MAPS: Dict[int, ItemIdMap] = {}
+_LATEST: Dict[str, Optional[int]] = {"data_version": None, "version": None}
+_LOCK = threading.Lock()
+
+
+def get_item_id_map(version: int) -> ItemIdMap:
+    """Return map ``version``, raise ValueError when it does not exist."""
+    id_map = _MAPS.get(version)
+    if id_map is None:
+        try:
+            part_ids = load_item_id_map(version)
+        except Exception:
+            logging.warning("item_id_map unavailable", exc_info=True)
+            part_ids = []
+        if not part_ids:
+            raise ValueError(f"Unknown item ID map version {version}")
+        id_map = _MAPS.setdefault(version, ItemIdMap.from_part_ids(version, part_ids))
+    return id_map
+
+
+def get_latest_item_id_map() -> Optional[ItemIdMap]:
+    """Return the newest map, None when the database has none (yet)."""
+    data_version = get_data_version()
+    with _LOCK:
+        if _LATEST["data_version"] != data_version:
+            try:
+                latest = load_latest_item_id_map()
+            except Exception:
+                logging.warning("item_id_map unavailable; dense IDs disabled", exc_info=True)
+                latest = None
+            if latest is not None and latest[1]:
+                _MAPS.setdefault(latest[0], ItemIdMap.from_part_ids(*latest))
+            _LATEST["version"] = latest[0] if latest is not None and latest[1] else None
+            _LATEST["data_version"] = data_version
+        version = _LATEST["version"]
+    return None if version is None else _MAPS[version]
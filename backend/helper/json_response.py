@@ -0,0 +1,76 @@
+import json
+import time
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Any, List, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+# Seconds spent serializing responses of the current request, see TimingMiddleware
+_serialize_seconds: ContextVar[Optional[List[float]]] = ContextVar(
+    "serialize_seconds", default=None
+)
+
+
+def _default(obj: Any) -> Any:
+    # drop_rate may come back from the DB as Decimal, and NumPy scalars or arrays
+    # from the search; both encoders see them as their plain float/int/list value
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+else:
+
+    def dumps(content: Any) -> bytes:
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+            default=_default,
+        ).encode("utf-8")
+
+
+def start_serialize_timing() -> List[float]:
+    """Start counting serialization time for the current request context."""
+    holder = [0.0]
+    _serialize_seconds.set(holder)
+    return holder
+
+
+def timed_dumps(content: Any) -> bytes:
+    """``dumps``, counted in the serialization time of the current request."""
+    start = time.perf_counter()
+    body = dumps(content)
+    holder = _serialize_seconds.get()
+    if holder is not None:
+        holder[0] += time.perf_counter() - start
+    return body
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    ``JSONResponse`` encoded with orjson when installed, the stdlib otherwise.
+
+    ``bytes`` content is JSON encoded beforehand (e.g. cached) and sent as is.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return timed_dumps(content)
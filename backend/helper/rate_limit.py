@@ -0,0 +1,74 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+RATE_LIMIT_PER_MIN = int(os.getenv("RATE_LIMIT_PER_MIN", "90"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", str(RATE_LIMIT_PER_MIN)))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+RATE_LIMIT_SWEEP_SECONDS = float(os.getenv("RATE_LIMIT_SWEEP_SECONDS", "60"))
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per client: ``burst`` requests at once, refilled at ``rate`` per second.
+
+    Each client costs one ``(tokens, last_seen)`` record, whatever its request rate.
+    Clients are kept in least recently seen order, which makes both bounds cheap:
+    past ``max_clients`` the least recently seen client is dropped, and every
+    ``sweep_interval`` seconds the clients whose bucket has refilled are dropped
+    from the front, a full bucket being what an unknown client gets anyway.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+        sweep_interval: float = RATE_LIMIT_SWEEP_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._next_sweep = clock() + sweep_interval
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests: int = RATE_LIMIT_PER_MIN, burst: int = RATE_LIMIT_BURST, **kwargs) -> "TokenBucketLimiter":
+        return cls(rate=requests / 60.0, burst=burst, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, client_id: str) -> Tuple[bool, int]:
+        """Take a token for ``client_id``; return ``(allowed, retry_after_seconds)``."""
+        now = self._clock()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            tokens, last = self._buckets.pop(client_id, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[client_id] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        if allowed:
+            return True, 0
+        return False, max(1, math.ceil((1 - tokens) / self.rate))
+
+    def _sweep(self, now: float) -> None:
+        refill_seconds = self.burst / self.rate
+        while self._buckets:
+            client_id, (tokens, last) = next(iter(self._buckets.items()))
+            if now - last < refill_seconds:
+                break
+            del self._buckets[client_id]
+        self._next_sweep = now + self.sweep_interval
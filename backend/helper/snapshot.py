@@ -0,0 +1,180 @@
+import fcntl
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+# Shared snapshots are off unless a directory is configured, e.g. on a volume that
+# every uvicorn worker of the host sees
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR")
+
+MAGIC = b"WFSNAP01"
+# Layout of the snapshots written through this module. Snapshots outlive deploys
+# on the volume, so bump it whenever a to_snapshot/from_snapshot pair changes
+# (DropGraph, EncodedBody): files of another layout are then rebuilt, not read.
+SNAPSHOT_FORMAT = 2
+ALIGNMENT = 64
+_HEADER_SIZE = struct.Struct("<Q")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Read-only arrays, byte blobs and JSON metadata stored in one file.
+
+    Snapshots read from disk keep the file mapped: the arrays are views into the
+    mapping, so every worker mapping the same file shares its pages. Blobs are
+    copied out as ``bytes``, which is what responses need.
+    """
+
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict)
+    blobs: Dict[str, bytes] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(path: str, snapshot: Snapshot) -> None:
+    """Write ``snapshot`` to ``path`` atomically (temporary file + rename)."""
+    sections = []
+    entries: Dict[str, Dict[str, Any]] = {"arrays": {}, "blobs": {}}
+    offset = 0
+    for name, arr in snapshot.arrays.items():
+        arr = np.ascontiguousarray(arr)
+        offset = _align(offset)
+        entries["arrays"][name] = {
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+            "offset": offset,
+        }
+        sections.append((offset, arr.tobytes()))
+        offset += arr.nbytes
+    for name, blob in snapshot.blobs.items():
+        offset = _align(offset)
+        entries["blobs"][name] = {"offset": offset, "length": len(blob)}
+        sections.append((offset, bytes(blob)))
+        offset += len(blob)
+
+    header = json.dumps(
+        {"format": SNAPSHOT_FORMAT, **entries, "meta": snapshot.meta}
+    ).encode("utf-8")
+    data_start = _align(len(MAGIC) + _HEADER_SIZE.size + len(header))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC + _HEADER_SIZE.pack(len(header)) + header)
+            for section_offset, data in sections:
+                f.seek(data_start + section_offset)
+                f.write(data)
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_snapshot(path: str) -> Snapshot:
+    """Map the snapshot at ``path`` read-only, without copying the arrays."""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[: len(MAGIC)] != MAGIC:
+        mapped.close()
+        raise ValueError(f"{path} is not a snapshot file")
+    (header_size,) = _HEADER_SIZE.unpack_from(mapped, len(MAGIC))
+    header_start = len(MAGIC) + _HEADER_SIZE.size
+    header = json.loads(mapped[header_start : header_start + header_size])
+    if header.get("format") != SNAPSHOT_FORMAT:
+        mapped.close()
+        raise ValueError(f"{path} has snapshot format {header.get('format')}, not {SNAPSHOT_FORMAT}")
+    data_start = _align(header_start + header_size)
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            mapped, dtype=dtype, count=count, offset=data_start + entry["offset"]
+        ).reshape(entry["shape"])
+    blobs = {
+        name: mapped[data_start + entry["offset"] : data_start + entry["offset"] + entry["length"]]
+        for name, entry in header["blobs"].items()
+    }
+    return Snapshot(arrays=arrays, blobs=blobs, meta=header["meta"])
+
+
+def snapshot_path(name: str, version: int, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or SNAPSHOT_DIR, f"{name}-{version}.snap")
+
+
+def _remove_stale(name: str, keep: str, directory: str) -> None:
+    for path in glob.glob(os.path.join(directory, f"{name}-*.snap")):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _try_read(path: str, max_age: Optional[float] = None) -> Optional[Snapshot]:
+    try:
+        if max_age is not None and time.time() - os.stat(path).st_mtime >= max_age:
+            return None
+        return read_snapshot(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error):
+        logging.warning(f"Snapshot {path} unreadable, rebuilding", exc_info=True)
+        return None
+
+
+def load_or_build(
+    name: str,
+    version: int,
+    build: Callable[[], Snapshot],
+    directory: Optional[str] = None,
+    max_age: Optional[float] = None,
+) -> Snapshot:
+    """
+    Return the shared snapshot ``name`` for ``version``, building it if no worker has.
+
+    Builders serialize on a lock file, so after an ingest one worker builds the
+    snapshot and the others wait and map its file. A file written ``max_age``
+    seconds ago or earlier is rebuilt and overwritten, for data that can change
+    without a new version. Without a snapshot directory the snapshot is simply
+    built in process.
+    """
+    directory = directory or SNAPSHOT_DIR
+    if not directory:
+        return build()
+    path = snapshot_path(name, version, directory)
+    snapshot = _try_read(path, max_age)
+    if snapshot is not None:
+        return snapshot
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{name}.lock"), "wb") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            # Another worker may have built it while we waited for the lock
+            snapshot = _try_read(path, max_age)
+            if snapshot is not None:
+                return snapshot
+            snapshot = build()
+            write_snapshot(path, snapshot)
+            _remove_stale(name, path, directory)
+            logging.info(f"Snapshot {path} written")
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return read_snapshot(path)
@@ -2,14 +2,16 @@ import importlib
 import os
 import pkgutil
 import time
-from collections import deque, defaultdict
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 import utils.logger  # noqa: F401 - initialize logging formatting
+from backend.helper.json_response import FastJSONResponse, start_serialize_timing
+from backend.helper.rate_limit import TokenBucketLimiter
 
 frontend_path = "../index.html"
 
@@ -31,50 +33,91 @@ def include_all_routers(app: FastAPI, base_package: str, base_prefix: str = ""):
                 )
 
 
-app = FastAPI(title="Warframe Drop API", version="v1")
+app = FastAPI(
+    title="Warframe Drop API", version="v1", default_response_class=FastJSONResponse
+)
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, max_requests: int = 90, window_seconds: int = 60):
-        super().__init__(app)
-        self.max_requests = max_requests
-        self.window = window_seconds
-        self.hits = defaultdict(deque)
+def _client_id(scope: Scope) -> str:
+    # Identify client by IP (use X-Forwarded-For when behind Caddy)
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
 
-    async def dispatch(self, request: Request, call_next):
-        # Identify client by IP (use X-Forwarded-For when behind Caddy)
-        xff = request.headers.get("x-forwarded-for")
-        if xff:
-            client_id = xff.split(",")[0].strip()
-        else:
-            client_id = request.client.host if request.client else "unknown"
-
-        now = time.time()
-        q = self.hits[client_id]
-        # Remove timestamps older than window
-        while q and now - q[0] >= self.window:
-            q.popleft()
-        if len(q) >= self.max_requests:
+
+class RateLimiterMiddleware:
+    """
+    Rate limiting as a plain ASGI middleware.
+
+    Unlike ``BaseHTTPMiddleware`` it neither spawns a task nor wraps the response
+    body stream per request, an allowed request is handed to the app untouched.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: TokenBucketLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        allowed, retry_after = self.limiter.hit(_client_id(scope))
+        if not allowed:
             # Too many requests
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=429,
                 content={
-                    "detail": "Rate limit exceeded. Max 90 requests per 60 seconds.",
+                    "detail": f"Rate limit exceeded. Max {round(self.limiter.rate * 60)} requests per 60 seconds.",
                 },
                 headers={
-                    "Retry-After": str(int(self.window - (now - q[0]))),
+                    "Retry-After": str(retry_after),
                 },
             )
-        q.append(now)
-        response = await call_next(request)
-        return response
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class TimingMiddleware:
+    """
+    Report request timings as ``Server-Timing``.
+
+    ``app`` is the time until the response started, ``serialize`` the part of it
+    spent encoding JSON response bodies.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        serialize_seconds = start_serialize_timing()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                duration = (time.perf_counter() - start) * 1000
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f"app;dur={duration:.2f}, serialize;dur={serialize_seconds[0] * 1000:.2f}",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
 
 
-# Add rate limiting middleware
+# Middlewares added last run first: CORS, then rate limiting, then timing
+app.add_middleware(TimingMiddleware)
+# Add rate limiting middleware, configured through RATE_LIMIT_PER_MIN
 app.add_middleware(
     RateLimiterMiddleware,
-    max_requests=90,
-    window_seconds=60,
+    limiter=TokenBucketLimiter.per_minute(),
 )
 
 # CORS configuration: allow GitHub Pages frontend and local development
@@ -2,23 +2,32 @@ import logging
 import time
 from typing import Dict, List, Any, Optional
 
-from fastapi import HTTPException, APIRouter
-from fastapi.responses import JSONResponse
+from fastapi import HTTPException, APIRouter, Request, Response
 
+from backend.helper.encoded_response import EncodedBody, encode_json, encoded_response
 from backend.helper.helper_function import fetchall
-from database.utils.time import get_last_update
+from backend.helper.snapshot import load_or_build
+from database.utils.version import get_data_version
 
 router = APIRouter()
 
 
 # Simple in-process cache (per FastAPI worker)
 _CACHE: Dict[str, Any] = {
-    "payload": None,  # type: Optional[List[Dict[str, Any]]]
+    "body": None,  # type: Optional[EncodedBody]
     "last_update": None,  # type: Optional[int]
     "ts": 0.0,  # type: float
 }
 _CACHE_TTL_SECONDS = 300  # set to 0 to disable TTL and rely solely on last_update
 
+JOINED_ROWS_QUERY = """
+    SELECT vs.warframe_set, vs.vaulted, vs.set_type,
+           pp.id AS part_id, pp.parts_name
+    FROM vault_status vs
+    LEFT JOIN prime_parts pp ON pp.warframe_set = vs.warframe_set
+    ORDER BY vs.warframe_set, pp.parts_name, pp.id
+"""
+
 
 class PrimeStatusService:
     """Get Prime status and parts information from the database efficiently."""
@@ -29,17 +38,7 @@ class PrimeStatusService:
         Be defensive: if DB/tables are unavailable, return an empty list.
         """
         try:
-            return fetchall(
-                (
-                    """
-                    SELECT vs.warframe_set, vs.vaulted, vs.set_type,
-                           pp.id AS part_id, pp.parts_name
-                    FROM vault_status vs
-                    LEFT JOIN prime_parts pp ON pp.warframe_set = vs.warframe_set
-                    ORDER BY vs.warframe_set, pp.parts_name, pp.id
-                    """
-                )
-            )
+            return fetchall(JOINED_ROWS_QUERY)
         except Exception:
             logging.warning("JOIN query failed; returning empty result (likely missing DB/tables)", exc_info=True)
             return []
@@ -73,8 +72,17 @@ class PrimeStatusService:
         return result
 
 
+def build_status_body(db_last: int) -> EncodedBody:
+    """Query, group and serialize the prime status for one drop table version."""
+    service = PrimeStatusService()
+    rows = service.get_joined_rows()
+    # If DB/tables missing or no data, serve empty list with 200
+    payload = service.build_payload(rows) if rows else []
+    return encode_json(payload, etag=f"prime-status-{db_last}")
+
+
 @router.get("")
-def get_prime_status() -> JSONResponse:
+def get_prime_status(request: Request) -> Response:
     """
     Get all prime set data including:
     - Set name
@@ -82,49 +90,41 @@ def get_prime_status() -> JSONResponse:
     - Type (warframe/weapon/companion)
     - Prime parts information (parts name and id)
 
-    Uses a single JOIN query and an in-memory cache keyed by last_update.
+    Uses a single JOIN query and an in-memory cache keyed by last_update. The cache
+    holds the serialized (and compressed) response, tagged with a strong ETag derived
+    from last_update and the body, so a hit only picks bytes and a revalidation gets a 304.
     """
     try:
-        # Cache gate using last_update and optional TTL
+        # Cache gate using the data version (last_update, see database.utils.version) and optional TTL
         now = time.time()
-        db_last = get_last_update()
+        db_last = get_data_version()
 
-        cached_payload = _CACHE.get("payload")
+        cached_body = _CACHE.get("body")
         cached_last = _CACHE.get("last_update")
         cached_ts = _CACHE.get("ts", 0.0)
 
         cache_valid = (
-            cached_payload is not None
+            cached_body is not None
             and cached_last == db_last
             and (_CACHE_TTL_SECONDS <= 0 or (now - cached_ts) < _CACHE_TTL_SECONDS)
         )
 
-        if cache_valid:
-            return JSONResponse(content=cached_payload, media_type="application/json")
-
-        # Cache miss: fetch via JOIN and rebuild
-        service = PrimeStatusService()
-        rows = service.get_joined_rows()
-
-        # If DB/tables missing or no data, serve empty list with 200
-        if not rows:
-            payload: List[Dict[str, Any]] = []
-            _CACHE["payload"] = payload
+        if not cache_valid:
+            # Cache miss: fetch via JOIN and rebuild
+            # One worker serializes the status per version, the others map its snapshot;
+            # past the TTL the snapshot is rebuilt too, edits need not bump last_update
+            snapshot = load_or_build(
+                "prime_status",
+                db_last,
+                lambda: build_status_body(db_last).to_snapshot(),
+                max_age=_CACHE_TTL_SECONDS if _CACHE_TTL_SECONDS > 0 else None,
+            )
+            cached_body = EncodedBody.from_snapshot(snapshot)
+            _CACHE["body"] = cached_body
             _CACHE["last_update"] = db_last
             _CACHE["ts"] = now
-            return JSONResponse(content=payload, media_type="application/json")
-
-        payload = service.build_payload(rows)
-        if not payload:
-            # No parts found; return empty list rather than error to keep API stable
-            payload = []
-
-        # Update cache
-        _CACHE["payload"] = payload
-        _CACHE["last_update"] = db_last
-        _CACHE["ts"] = now
 
-        return JSONResponse(content=payload, media_type="application/json")
+        return encoded_response(request, cached_body)
 
     except HTTPException:
         raise
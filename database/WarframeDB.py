@@ -7,37 +7,6 @@ import dotenv
 dotenv.load_dotenv()
 
 
-def batch_insert_objects(objects: List[Any], table_name: str, columns: List[str],
-                         value_extractor, chunk_size: int = 5000) -> bool:
-    if not objects:
-        return False
-
-    placeholders = ', '.join(['?' for _ in columns])
-    insert_sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
-
-    try:
-        total_inserted = 0
-        logging.debug(f'DB Action: START BATCH INSERT {len(objects)} items to {table_name}')
-
-        for i in range(0, len(objects), chunk_size):
-            chunk = objects[i:i + chunk_size]
-            values = [value_extractor(obj) for obj in chunk]
-
-            logging.debug(
-                f'DB Action: INSERTING ITEMS to {table_name}, ({chunk_size} of remaining {len(objects) - total_inserted} items)')
-            WarframeDB().execute_many(insert_sql, values)
-            total_inserted += len(chunk)
-            logging.info(
-                f"DB Action: BATCH ITEMS INSERTED to {table_name}, current progress: {total_inserted}/{len(objects)}")
-
-        logging.info(f"DB Action: BATCH ITEMS INSERTED COMPLETE, total items: {total_inserted}/{len(objects)}")
-        return True
-
-    except Exception as e:
-        logging.error(f"DB Action: BATCH INSERT FAILED, ERROR: {e}")
-        return False
-
-
 class WarframeDB:
     def __init__(self, db_name=None):
         # Prefer DB_NAME, then DB_PATH, then default file path
@@ -53,6 +22,16 @@ class WarframeDB:
             logging.error(f'DB action: CREATE TABLE IF NOT EXISTS {table_name} ({", ".join(columns)}), ERROR: {e}')
         self.conn.close()
 
+    def create_index(self, table_name: str, columns: List[str]) -> None:
+        index_name = f'ix_{table_name}_{"_".join(columns)}'
+        query = f'CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({", ".join(columns)})'
+        try:
+            logging.debug(f'DB action: {query}')
+            self.cursor.execute(query)
+        except Exception as e:
+            logging.error(f'DB action: {query}, ERROR: {e}')
+        self.conn.close()
+
     def drop_table(self, table_name: str) -> None:
         try:
             logging.debug(f'DB action: DROP TABLE IF EXISTS {table_name}')
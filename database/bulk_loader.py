@@ -0,0 +1,98 @@
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+import dotenv
+
+dotenv.load_dotenv()
+
+LOAD_CACHE_KIB = int(os.getenv("LOAD_CACHE_KIB", str(256 * 1024)))
+LOAD_JOURNAL_MODE = os.getenv("LOAD_JOURNAL_MODE", "MEMORY")
+
+
+class BulkLoader:
+    """
+    One write connection for a whole ingest, one transaction per section.
+
+    Opened with load-time pragmas: no fsync (``synchronous = OFF``), the rollback
+    journal in memory and a large page cache. A section either commits completely
+    or rolls back, but a crash of the machine mid-ingest can leave the file
+    damaged, so load into a ``StagingDatabase`` copy that is swapped in once complete.
+
+    Use as a context manager::
+
+        with BulkLoader() as loader, loader.transaction():
+            loader.insert_rows("relic_rewards", columns, rows)
+    """
+
+    def __init__(self, db_name: Optional[str] = None, chunk_size: int = 5000):
+        # Prefer DB_NAME, then DB_PATH, then default file path, like WarframeDB
+        env_db_name = os.getenv("DB_NAME") or os.getenv("DB_PATH") or "database/warframe.db"
+        self.db_name = db_name or env_db_name
+        self.chunk_size = chunk_size
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "BulkLoader":
+        # Autocommit mode, transactions are opened explicitly by transaction()
+        self.conn = sqlite3.connect(self.db_name, isolation_level=None)
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute(f"PRAGMA journal_mode = {LOAD_JOURNAL_MODE}")
+        self.conn.execute(f"PRAGMA cache_size = -{LOAD_CACHE_KIB}")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.conn.close()
+        self.conn = None
+
+    @contextmanager
+    def transaction(self) -> Iterator["BulkLoader"]:
+        self.conn.execute("BEGIN")
+        try:
+            yield self
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def execute(self, query: str) -> None:
+        logging.debug(f"DB action: {query}")
+        self.conn.execute(query)
+
+    def has_table(self, table_name: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [table_name]
+        ).fetchone() is not None
+
+    def drop_table(self, table_name: str) -> None:
+        self.execute(f"DROP TABLE IF EXISTS {table_name}")
+
+    def create_table(self, table_name: str, columns: List[str]) -> None:
+        self.execute(f'CREATE TABLE IF NOT EXISTS {table_name} ({", ".join(columns)})')
+
+    def create_index(self, table_name: str, columns: List[str]) -> None:
+        index_name = f'ix_{table_name}_{"_".join(columns)}'
+        self.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({", ".join(columns)})'
+        )
+
+    def insert_rows(self, table_name: str, columns: List[str], rows: Iterable[tuple]) -> int:
+        """Insert rows as they are produced, ``chunk_size`` at a time, and return the count."""
+        placeholders = ", ".join("?" for _ in columns)
+        insert_sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+        start = time.perf_counter()
+        total = 0
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            self.conn.executemany(insert_sql, chunk)
+            total += len(chunk)
+        elapsed = time.perf_counter() - start
+        logging.info(
+            f"DB Action: {total} rows INSERTED to {table_name} in {elapsed:.2f}s "
+            f"({total / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+        return total
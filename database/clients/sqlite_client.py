@@ -1,20 +1,99 @@
 import os
 import sqlite3
-from typing import Any, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_KIB = int(os.getenv("SQLITE_CACHE_KIB", str(64 * 1024)))
+SQLITE_WARM_CACHE = os.getenv("SQLITE_WARM_CACHE", "1") != "0"
+WARM_CHUNK_SIZE = 1024 * 1024
+
+
+def _read_through(path: str) -> None:
+    # A sequential read pulls the file into the OS page cache, which every
+    # connection's mmap then shares
+    with open(path, "rb") as f:
+        while f.read(WARM_CHUNK_SIZE):
+            pass
 
 
 class SqliteClient:
+    """
+    Read-only SQLite client.
+
+    Connections are opened once per thread and database path and then reused, so a
+    request borrows a warm connection instead of paying for ``sqlite3.connect`` and a
+    cold page cache on every query. They are opened with ``mode=ro`` and
+    ``query_only``, the API never writes.
+    """
+
+    _local = threading.local()
+    # (path, inode) of the files already read through by this process
+    _warmed: Set[Tuple[str, Optional[int]]] = set()
+    _warm_lock = threading.Lock()
+
     def __init__(self, db_name: Optional[str] = None):
         env_db_name = os.getenv("DB_NAME") or os.getenv("DB_PATH") or "data/warframe.db"
-        self.conn = sqlite3.connect(db_name or env_db_name)
-        self.cur = self.conn.cursor()
+        self.db_name = db_name or env_db_name
 
-    def select(self, query: str, params: Optional[List[Any]] = None) -> List[tuple]:
+    @classmethod
+    def _pool(cls) -> Dict[str, Tuple[sqlite3.Connection, Optional[int]]]:
+        if not hasattr(cls._local, "connections"):
+            cls._local.connections = {}
+        return cls._local.connections
+
+    def _inode(self) -> Optional[int]:
         try:
-            if params:
-                self.cur.execute(query, params)
-            else:
-                self.cur.execute(query)
-            return self.cur.fetchall()
-        finally:
-            self.conn.close()
+            return os.stat(self.db_name).st_ino
+        except OSError:
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{quote(self.db_name)}?mode=ro", uri=True, cached_statements=256
+        )
+        try:
+            conn.execute("PRAGMA query_only = ON")
+            conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+            conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_KIB}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _warm(self, inode: Optional[int]) -> None:
+        """Read the file once per process and file, not once per pooled thread."""
+        key = (self.db_name, inode)
+        with self._warm_lock:
+            if key in self._warmed:
+                return
+            self._warmed.add(key)
+        _read_through(self.db_name)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        pool = self._pool()
+        entry = pool.get(self.db_name)
+        inode = self._inode()
+        # The ingest swaps a new file in by rename (see database/staging.py): an open
+        # connection keeps reading the old one, so reopen once the path points elsewhere.
+        # A missing file keeps the old connection serving.
+        if entry is not None and inode is not None and entry[1] != inode:
+            entry[0].close()
+            entry = None
+        if entry is None:
+            entry = pool[self.db_name] = (self._connect(), inode)
+            if SQLITE_WARM_CACHE:
+                self._warm(inode)
+        return entry[0]
+
+    def close(self) -> None:
+        entry = self._pool().pop(self.db_name, None)
+        if entry is not None:
+            entry[0].close()
+
+    def select(self, query: str, params: Optional[List[Any]] = None) -> List[tuple]:
+        if params:
+            return self.conn.execute(query, params).fetchall()
+        return self.conn.execute(query).fetchall()
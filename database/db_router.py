@@ -1,5 +1,6 @@
+import json
 import logging
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Sequence
 
 import dotenv
 
@@ -11,6 +12,7 @@ logger = logging.getLogger(__name__)
 
 
 def _sqlite_client() -> SqliteClient:
+    # Cheap: the client borrows this thread's pooled connection for the DB path
     return SqliteClient()
 
 
@@ -24,3 +26,18 @@ def select(query: str, params: Optional[List[Any]] = None) -> List[tuple]:
 
     client = _sqlite_client()
     return client.select(query, list(params) if params is not None else None)
+
+
+# Stands in for the key list of select_in, bound as a single JSON array parameter
+IN_KEYS = "SELECT value FROM json_each(?)"
+
+
+def select_in(query: str, keys: Sequence[Any]) -> List[tuple]:
+    """Bulk key lookup, ``query`` uses ``{keys}`` where the key list goes.
+
+    e.g. ``select_in("SELECT * FROM relic_rewards WHERE prize IN ({keys})", names)``
+
+    The SQL text is the same for any number of keys, so sqlite3's statement cache
+    reuses the parsed and planned statement instead of one per list length.
+    """
+    return select(query.replace("{keys}", IN_KEYS), [json.dumps(list(keys))])
@@ -2,7 +2,7 @@ import datetime
 import decimal
 from typing import Optional
 
-from sqlalchemy import Column, DECIMAL, Integer, TIMESTAMP, Table, Text, text
+from sqlalchemy import Column, DECIMAL, Index, Integer, TIMESTAMP, Table, Text, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -78,6 +78,16 @@ class DynamicLocationRewards(Base):
     )
 
 
+t_item_id_map = Table(
+    "item_id_map",
+    Base.metadata,
+    Column("version", Integer, nullable=False),
+    Column("dense_id", Integer, nullable=False),
+    Column("part_id", Integer, nullable=False),
+    Index("ix_item_id_map_version_dense_id", "version", "dense_id"),
+)
+
+
 class KeyRewards(Base):
     __tablename__ = "key_rewards"
 
@@ -137,8 +147,21 @@ class ModDropsBySource(Base):
     )
 
 
+t_part_relic_best = Table(
+    "part_relic_best",
+    Base.metadata,
+    Column("prize", Text, nullable=False),
+    Column("relic", Text, nullable=False),
+    Column("radiant", Text, nullable=False),
+    Column("drop_rate", DECIMAL(5, 4), nullable=False),
+    Column("seq", Integer, nullable=False),
+    Index("ix_part_relic_best_prize", "prize"),
+)
+
+
 class PrimeParts(Base):
     __tablename__ = "prime_parts"
+    __table_args__ = (Index("ix_prime_parts_warframe_set", "warframe_set"),)
 
     warframe_set: Mapped[str] = mapped_column(Text, nullable=False)
     parts_name: Mapped[str] = mapped_column(Text, nullable=False)
@@ -158,6 +181,18 @@ class RelicDropsBySource(Base):
     )
 
 
+t_relic_source_scores = Table(
+    "relic_source_scores",
+    Base.metadata,
+    Column("relic", Text, nullable=False),
+    Column("source", Text, nullable=False),
+    Column("rotation", Text, nullable=False),
+    Column("drop_rate", DECIMAL(5, 4), nullable=False),
+    Column("seq", Integer, nullable=False),
+    Index("ix_relic_source_scores_relic", "relic"),
+)
+
+
 class RelicRewards(Base):
     __tablename__ = "relic_rewards"
 
@@ -211,6 +246,14 @@ class SigilDropsBySource(Base):
     )
 
 
+t_section_hashes = Table(
+    "section_hashes",
+    Base.metadata,
+    Column("table_name", Text, primary_key=True),
+    Column("hash", Text, nullable=False),
+)
+
+
 class SortieRewards(Base):
     __tablename__ = "sortie_rewards"
 
@@ -226,6 +269,7 @@ class SortieRewards(Base):
 
 class VaultStatus(Base):
     __tablename__ = "vault_status"
+    __table_args__ = (Index("ix_vault_status_warframe_set", "warframe_set"),)
 
     warframe_set: Mapped[str] = mapped_column(Text, nullable=False)
     vaulted: Mapped[str] = mapped_column(Text, nullable=False)
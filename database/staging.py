@@ -0,0 +1,112 @@
+import logging
+import os
+import sqlite3
+from typing import Iterable, Optional
+from urllib.parse import quote
+
+import dotenv
+
+from database.schema import RelicRewards, t_last_update, t_part_relic_best, t_relic_source_scores
+from database.utils.indexes import analyze
+
+dotenv.load_dotenv()
+
+# Tables the API cannot serve without, checked before a staging file goes live
+REQUIRED_TABLES = [
+    RelicRewards.__tablename__,
+    "prime_parts",
+    t_part_relic_best.name,
+    t_relic_source_scores.name,
+    t_last_update.name,
+]
+
+
+class StagingDatabase:
+    """
+    Build a new database file next to the live one and swap it in when complete.
+
+    Entering copies the live database (with the SQLite backup API, so the tables an
+    ingest does not rebuild, like prime_parts or item_id_map, come along) to
+    ``<db>.staging``; the ingest then writes only to ``path``. Leaving without an
+    error validates the copy, runs ``ANALYZE`` and renames it over the live file,
+    which is atomic on the same filesystem. Readers keep the old file open and
+    serve from it until they reopen, so an ingest is never API downtime. On error
+    the staging file is deleted and the live database is left untouched.
+
+    Use as a context manager::
+
+        with StagingDatabase() as staging, BulkLoader(staging.path) as loader:
+            ...
+    """
+
+    def __init__(self, db_name: Optional[str] = None, required_tables: Iterable[str] = REQUIRED_TABLES):
+        # Prefer DB_NAME, then DB_PATH, then default file path, like WarframeDB
+        env_db_name = os.getenv("DB_NAME") or os.getenv("DB_PATH") or "database/warframe.db"
+        self.db_name = db_name or env_db_name
+        self.path = self.db_name + ".staging"
+        self.required_tables = list(required_tables)
+
+    def __enter__(self) -> "StagingDatabase":
+        self._remove()
+        target = sqlite3.connect(self.path)
+        try:
+            if os.path.exists(self.db_name):
+                source = sqlite3.connect(f"file:{quote(self.db_name)}?mode=ro", uri=True)
+                try:
+                    source.backup(target)
+                finally:
+                    source.close()
+            # A rollback journal, so no -wal file has to travel with the swap
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+        logging.info(f"MainUpdate: Staging {self.db_name} in {self.path}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            logging.error(f"MainUpdate: Ingest failed, discarding {self.path}")
+            self._remove()
+            return
+        try:
+            self.validate()
+            self.publish()
+        except BaseException:
+            self._remove()
+            raise
+
+    def validate(self) -> None:
+        """Raise ValueError unless the staging file is sound and has every required table filled."""
+        conn = sqlite3.connect(self.path)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchall()
+            if result != [("ok",)]:
+                raise ValueError(f"Staging database failed integrity_check: {result[:5]}")
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table in self.required_tables:
+                if table not in tables:
+                    raise ValueError(f"Staging database lacks table {table}")
+                if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None:
+                    raise ValueError(f"Staging database has an empty {table}")
+        finally:
+            conn.close()
+
+    def publish(self) -> None:
+        """Run ANALYZE on the staging file, flush it to disk and rename it over the live one."""
+        analyze(self.path)
+        with open(self.path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(self.path, self.db_name)
+        directory = os.open(os.path.dirname(os.path.abspath(self.db_name)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+        logging.info(f"MainUpdate: Swapped {self.path} in as {self.db_name}")
+
+    def _remove(self) -> None:
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,52 @@
+import logging
+from typing import List, Optional
+
+from sqlalchemy import Table
+
+from database.WarframeDB import WarframeDB
+from database.schema import RelicRewards, RewardTables, t_part_relic_best, t_relic_source_scores
+
+# Best refinement per (prize, relic). SQLite returns the bare ``radiant`` column
+# from the row holding the MAX. ``seq`` is the first relic_rewards row of the pair.
+PART_RELIC_BEST_SELECT = f"""
+    SELECT prize, relic, radiant, MAX(drop_rate) AS drop_rate, MIN(id) AS seq
+    FROM {RelicRewards.__tablename__}
+    GROUP BY prize, relic
+"""
+
+# Summed relic drop rates per (relic, source, rotation letter) over all reward
+# tables. ``seq`` orders the groups like the rows of RewardTables.TABLES.
+RELIC_SOURCE_SCORES_SELECT = """
+    SELECT prize AS relic, source, rotation, SUM(drop_rate) AS drop_rate, MIN(seq) AS seq
+    FROM ({union})
+    GROUP BY prize, source, rotation
+""".format(
+    union=" UNION ALL ".join(
+        f"SELECT prize, source, substr(rotation, -1) AS rotation, drop_rate, "
+        f"{rank} * 4294967296 + id AS seq FROM {table.__tablename__} "
+        f"WHERE prize IN (SELECT relic FROM {RelicRewards.__tablename__})"
+        for rank, table in enumerate(RewardTables.TABLES)
+    )
+)
+
+DERIVED_TABLES = [
+    (t_part_relic_best, PART_RELIC_BEST_SELECT),
+    (t_relic_source_scores, RELIC_SOURCE_SCORES_SELECT),
+]
+
+
+def get_table_schema(table: Table) -> List[str]:
+    return [
+        f"{column.name} {column.type.compile()}{'' if column.nullable else ' NOT NULL'}"
+        for column in table.columns
+    ]
+
+
+def update_derived_tables(db_name: Optional[str] = None) -> None:
+    """Rebuild the search tables from the raw drop tables, run at the end of an ingest."""
+    for table, select in DERIVED_TABLES:
+        logging.info(f"MainUpdate: Deriving {table.name}")
+        WarframeDB(db_name).drop_table(table.name)
+        WarframeDB(db_name).create_table(table.name, get_table_schema(table))
+        columns = ", ".join(column.name for column in table.columns)
+        WarframeDB(db_name).execute_query(f"INSERT INTO {table.name} ({columns}) {select}")
@@ -0,0 +1,59 @@
+import logging
+from typing import List, Optional, Tuple
+
+from database.WarframeDB import WarframeDB
+from database.db_router import select
+from database.schema import VaultStatus, t_item_id_map
+from database.utils.derived import get_table_schema
+
+# Dense numbering of prime_parts: unvaulted parts first, so the bitmaps of the
+# parts people actually search for stay short, then the rest, each by part ID
+DENSE_ORDER_QUERY = f"""
+    SELECT id FROM prime_parts
+    ORDER BY warframe_set NOT IN (
+        SELECT warframe_set FROM {VaultStatus.__tablename__} WHERE vaulted = '0'
+    ), id
+"""
+LATEST_VERSION_QUERY = f"SELECT MAX(version) FROM {t_item_id_map.name}"
+ID_MAP_QUERY = (
+    f"SELECT part_id FROM {t_item_id_map.name} WHERE version = ? ORDER BY dense_id"
+)
+
+
+def load_item_id_map(version: int) -> List[int]:
+    """Part IDs of one map version, indexed by dense ID (read-only API path)."""
+    return [x[0] for x in select(ID_MAP_QUERY, [version])]
+
+
+def load_latest_item_id_map() -> Optional[Tuple[int, List[int]]]:
+    """``(version, part IDs)`` of the newest map, None when there is none."""
+    rows = select(LATEST_VERSION_QUERY)
+    if not rows or rows[0][0] is None:
+        return None
+    version = rows[0][0]
+    return version, load_item_id_map(version)
+
+
+def update_item_id_map(db_name: Optional[str] = None) -> None:
+    """
+    Add a new item_id_map version when the dense numbering of prime_parts changed.
+
+    Versions are never rewritten or deleted: links encoded against an old version
+    keep decoding through its rows. Run at the end of an ingest.
+    """
+    WarframeDB(db_name).create_table(t_item_id_map.name, get_table_schema(t_item_id_map))
+    order = [x[0] for x in WarframeDB(db_name).fetch_all(DENSE_ORDER_QUERY) or []]
+    latest = WarframeDB(db_name).fetch_all(LATEST_VERSION_QUERY)
+    version = latest[0][0] if latest and latest[0][0] is not None else 0
+    current = WarframeDB(db_name).fetch_all(
+        f"SELECT part_id FROM {t_item_id_map.name} WHERE version = {version} ORDER BY dense_id"
+    )
+    if version and [x[0] for x in current or []] == order:
+        logging.info(f"MainUpdate: item_id_map unchanged at version {version}")
+        return
+    version += 1
+    WarframeDB(db_name).execute_many(
+        f"INSERT INTO {t_item_id_map.name} (version, dense_id, part_id) VALUES (?, ?, ?)",
+        [(version, dense_id, part_id) for dense_id, part_id in enumerate(order)],
+    )
+    logging.info(f"MainUpdate: item_id_map version {version}, {len(order)} parts")
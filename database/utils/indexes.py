@@ -0,0 +1,19 @@
+import logging
+from typing import Optional
+
+from database.WarframeDB import WarframeDB
+from database.schema import Base
+
+
+def create_schema_indexes(db_name: Optional[str] = None) -> None:
+    """Create the indexes declared in database/schema.py, for the tables the
+    drop-table updaters do not own (prime_parts, vault_status, derived tables)."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            WarframeDB(db_name).create_index(table.name, [column.name for column in index.columns])
+
+
+def analyze(db_name: Optional[str] = None) -> None:
+    """Refresh the query planner statistics, run once at the end of an ingest."""
+    logging.info("MainUpdate: Running ANALYZE")
+    WarframeDB(db_name).execute_query("ANALYZE")
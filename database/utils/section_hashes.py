@@ -0,0 +1,22 @@
+from typing import Dict, Optional
+
+from database.WarframeDB import WarframeDB
+from database.schema import t_section_hashes
+from database.utils.derived import get_table_schema
+
+
+def load_section_hashes(db_name: Optional[str] = None) -> Dict[str, str]:
+    """Content hash of the sections each drop table was last built from, by table name."""
+    WarframeDB(db_name).create_table(t_section_hashes.name, get_table_schema(t_section_hashes))
+    rows = WarframeDB(db_name).fetch_all(f"SELECT table_name, hash FROM {t_section_hashes.name}")
+    return dict(rows or [])
+
+
+def store_section_hashes(hashes: Dict[str, str], db_name: Optional[str] = None) -> None:
+    """Replace the stored hashes with ``hashes``, run at the end of an ingest."""
+    WarframeDB(db_name).create_table(t_section_hashes.name, get_table_schema(t_section_hashes))
+    WarframeDB(db_name).execute_query(f"DELETE FROM {t_section_hashes.name}")
+    WarframeDB(db_name).execute_many(
+        f"INSERT INTO {t_section_hashes.name} (table_name, hash) VALUES (?, ?)",
+        sorted(hashes.items()),
+    )
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from database.WarframeDB import WarframeDB
 from database.db_router import select
@@ -18,6 +19,6 @@ def get_last_update() -> int:
         return 0
 
 
-def update_time(timestamp: int) -> None:
+def update_time(timestamp: int, db_name: Optional[str] = None) -> None:
     # Keep local write path via SQLite; API uses only reads from D1
-    WarframeDB().execute_query(f"UPDATE last_update SET time = {timestamp}")
+    WarframeDB(db_name).execute_query(f"UPDATE last_update SET time = {timestamp}")
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from database.clients.sqlite_client import SqliteClient
+from database.utils.time import get_last_update
+
+# Seconds between two looks at the DB files, 0 looks on every call
+VERSION_CHECK_INTERVAL = float(os.getenv("VERSION_CHECK_INTERVAL", "1.0"))
+
+
+class DataVersionWatcher:
+    """
+    In-process data version token, re-read only when the DB file changes.
+
+    The ingest is the only writer, so the files on disk change exactly when
+    ``last_update`` can. Instead of querying ``last_update`` per request, the watcher
+    compares the inode, mtime and size of the DB file and its WAL, and the change
+    counter of the DB header, with what it saw last time (at most once per
+    ``interval``) and only queries when they differ. An atomic swap of the file
+    changes the inode, an in place write the mtime and change counter.
+
+    The token is the ``last_update`` value itself, so it can be used directly as a
+    cache version or ETag.
+    """
+
+    def __init__(
+        self,
+        db_name: Optional[str] = None,
+        interval: float = VERSION_CHECK_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.db_name = db_name
+        self.interval = interval
+        self._clock = clock
+        self._token: Optional[int] = None
+        self._signature: Optional[Tuple] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _file_signature(self) -> Tuple:
+        path = self.db_name or SqliteClient().db_name
+        signature = []
+        for suffix in ("", "-wal"):
+            try:
+                st = os.stat(path + suffix)
+            except OSError:
+                signature.append(None)
+                continue
+            signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        try:
+            # The file change counter of the DB header, bumped by every commit
+            # outside WAL mode, even when the mtime has too coarse a resolution
+            with open(path, "rb") as f:
+                f.seek(24)
+                signature.append(f.read(4))
+        except OSError:
+            signature.append(None)
+        return tuple(signature)
+
+    def get(self) -> int:
+        """Return the current version token."""
+        now = self._clock()
+        if self._token is not None and now < self._next_check:
+            return self._token
+        with self._lock:
+            if self._token is not None and now < self._next_check:
+                return self._token
+            signature = self._file_signature()
+            if self._token is None or signature != self._signature:
+                self._token = get_last_update()
+                self._signature = signature
+            self._next_check = now + self.interval
+            return self._token
+
+    def invalidate(self) -> None:
+        """Forget the token, the next ``get`` queries ``last_update`` again."""
+        with self._lock:
+            self._token = None
+            self._signature = None
+
+
+# One watcher per process, shared by every cache keyed on the drop table version
+data_version = DataVersionWatcher()
+
+
+def get_data_version() -> int:
+    return data_version.get()
@@ -1,16 +1,48 @@
+import hashlib
 import logging
 from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
 
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+from database.bulk_loader import BulkLoader
+from database.staging import StagingDatabase
+from database.utils.derived import update_derived_tables
+from database.utils.id_map import update_item_id_map
+from database.utils.indexes import create_schema_indexes
+from database.utils.section_hashes import load_section_hashes, store_section_hashes
 from database.utils.time import get_last_update, update_time
 from parser.drop_table.updater import *
-from parser.drop_table.utils.commonFunctions import is_drop_table_available
+from parser.drop_table.utils.download import DROP_TABLE_CACHE, fetch_drop_table, forget_drop_table
+from parser.drop_table.utils.stream_parser import DropTablePage
 
 load_dotenv()
 
+# Updater of each section, by its <h3> title without the trailing colon
+SECTION_UPDATERS = {
+    "Missions": UpdateMissionReward,
+    "Relics": UpdateRelicReward,
+    "Dynamic Location Rewards": UpdateDynamicLocationReward,
+    "Sorties": UpdateSortieReward,
+    "Cetus Bounty Rewards": UpdateBountyReward,
+    "Orb Vallis Bounty Rewards": UpdateBountyReward,
+    "Cambion Drift Bounty Rewards": UpdateBountyReward,
+    "Zariman Bounty Rewards": UpdateBountyReward,
+    "Albrecht's Laboratories Bounty Rewards": UpdateBountyReward,
+    "Hex Bounty Rewards": UpdateBountyReward,
+    "Mod Drops by Source": UpdateModBySource,
+    "Mod Drops by Mod": UpdateModByMod,
+    "Blueprint/Item Drops by Source": UpdateBlueprintBySource,
+    "Blueprint/Item Drops by Blueprint/Item": UpdateBlueprintByItem,
+    "Resource Drops by Source": UpdateResourceBySource,
+    "Resource Drops by Resource": UpdateResourceByResource,
+    "Sigil Drops by Source": UpdateSigilBySource,
+    "Additional Item Drops by Source": UpdateAdditionalItemBySource,
+    "Relic Drops by Source": UpdateRelicBySource,
+    "Keys": UpdateKeyReward,
+}
+
 
 # debug function
 def generate_debug_time():
@@ -19,82 +51,112 @@ def generate_debug_time():
 
 
 class UpdateDropDB:
-    def __init__(self) -> None:
-        self.body = self.__get_body()
-        self.web_update_time = int(
-            datetime.strptime(
-                self.body.find("h3").previous.strip(), "%d %B, %Y"
-            ).timestamp()
-        )
-        self.update()
-
-    @staticmethod
-    def __get_body():
-        url = "https://warframe-web-assets.nyc3.cdn.digitaloceanspaces.com/uploads/cms/hnfvc0o3jnfvc873njb03enrf56.html"
-        html = requests.get(url)
-        soup = BeautifulSoup(html.text, "html.parser")
-        return soup.find("body")
+    def __init__(self, force: bool = False, offline: bool = False, cache_path: str = DROP_TABLE_CACHE) -> None:
+        # force rebuilds every table, whatever the stored section hashes say;
+        # offline parses the page already in cache_path without any request
+        self.force = force
+        if not offline:
+            try:
+                modified = fetch_drop_table(cache_path=cache_path)
+            except requests.RequestException:
+                logging.error("MainUpdate: Drop table not available", exc_info=True)
+                return
+            if not modified and not force:
+                logging.info("MainUpdate: No update needed")
+                return
+        try:
+            self.page = DropTablePage(cache_path)
+            self.web_update_time = int(
+                datetime.strptime(self.page.read_date(), "%d %B, %Y").timestamp()
+            )
+            self.update()
+        except BaseException:
+            # Download the page again next time instead of trusting a 304 for it
+            forget_drop_table(cache_path)
+            raise
 
     def is_update_needed(self) -> bool:
         logging.info("MainUpdate: Checking if update needed")
         return get_last_update() < self.web_update_time
 
     def update(self) -> None:
-        if not is_drop_table_available():
-            logging.error("MainUpdate: Drop table not available")
-            return
         if not self.is_update_needed():
             logging.info("MainUpdate: No update needed")
             return
         else:
             logging.info("MainUpdate: Start updating drop_table table")
 
-            h3 = self.body.find_all("h3")[2:]
-            tables = self.body.find_all("table")
-
-            for title, table in zip(h3, tables):
-                match title.get_text()[:-1]:
-                    case "Missions":
-                        UpdateMissionReward(table).run_update()
-                    case "Relics":
-                        UpdateRelicReward(table).run_update()
-                    case "Dynamic Location Rewards":
-                        UpdateDynamicLocationReward(table).run_update()
-                    case "Sorties":
-                        UpdateSortieReward(table).run_update()
-                    case "Cetus Bounty Rewards":
-                        UpdateBountyReward(table).run_update()
-                    case "Orb Vallis Bounty Rewards":
-                        UpdateBountyReward(table).run_update()
-                    case "Cambion Drift Bounty Rewards":
-                        UpdateBountyReward(table).run_update()
-                    case "Zariman Bounty Rewards":
-                        UpdateBountyReward(table).run_update()
-                    case "Albrecht's Laboratories Bounty Rewards":
-                        UpdateBountyReward(table).run_update()
-                    case "Hex Bounty Rewards":
-                        UpdateBountyReward(table).run_update()
-                    case "Mod Drops by Source":
-                        UpdateModBySource(table).run_update()
-                    case "Mod Drops by Mod":
-                        UpdateModByMod(table).run_update()
-                    case "Blueprint/Item Drops by Source":
-                        UpdateBlueprintBySource(table).run_update()
-                    case "Blueprint/Item Drops by Blueprint/Item":
-                        UpdateBlueprintByItem(table).run_update()
-                    case "Resource Drops by Source":
-                        UpdateResourceBySource(table).run_update()
-                    case "Resource Drops by Resource":
-                        UpdateResourceByResource(table).run_update()
-                    case "Sigil Drops by Source":
-                        UpdateSigilBySource(table).run_update()
-                    case "Additional Item Drops by Source":
-                        UpdateAdditionalItemBySource(table).run_update()
-                    case "Relic Drops by Source":
-                        UpdateRelicBySource(table).run_update()
-                    case "Keys":
-                        UpdateKeyReward(table).run_update()
-                    case _:
-                        logging.error(f"MainUpdate: Unknown title: {title}")
-
-            update_time(self.web_update_time)
+            hashes, counts = self.hash_sections()
+
+            # Build a complete new database next to the live one, which keeps
+            # serving the API until the new file is validated and swapped in
+            with StagingDatabase() as staging:
+                stored = load_section_hashes(staging.path)
+                # One connection for the whole ingest, one transaction per table
+                with BulkLoader(staging.path) as loader:
+                    changed = {}
+                    for table_name, table_hash in hashes.items():
+                        if (
+                            not self.force
+                            and stored.get(table_name) == table_hash
+                            and loader.has_table(table_name)
+                        ):
+                            logging.info(
+                                f"MainUpdate: {table_name} unchanged ({counts[table_name]} sections), skipping"
+                            )
+                        else:
+                            changed[table_name] = counts[table_name]
+                    if changed:
+                        self.load_sections(loader, changed)
+
+                store_section_hashes(hashes, staging.path)
+                update_item_id_map(staging.path)
+                update_derived_tables(staging.path)
+                create_schema_indexes(staging.path)
+                update_time(self.web_update_time, staging.path)
+
+    def known_sections(self, warn: bool = True) -> Iterator[BaseUpdater]:
+        """Updater of each known section, streamed in page order."""
+        for section in self.page.sections():
+            updater_cls = SECTION_UPDATERS.get(section.title[:-1])
+            if updater_cls is None:
+                if warn:
+                    logging.error(f"MainUpdate: Unknown title: {section.title}")
+                continue
+            yield updater_cls(section.rows)
+
+    def hash_sections(self) -> Tuple[Dict[str, str], Dict[str, int]]:
+        """
+        First pass over the page: the content hash and the section count of each
+        table. Only hashes are kept, the rows of a section go once it is hashed.
+        """
+        section_hashes: Dict[str, List[str]] = {}
+        for updater in self.known_sections():
+            section_hashes.setdefault(updater.get_table_name(), []).append(updater.content_hash())
+        hashes = {table_name: self.sections_hash(h) for table_name, h in section_hashes.items()}
+        return hashes, {table_name: len(h) for table_name, h in section_hashes.items()}
+
+    def load_sections(self, loader: BulkLoader, counts: Dict[str, int]) -> None:
+        """
+        Second pass over the page: rebuild each table of ``counts`` as soon as its
+        ``counts[table]`` sections are read. Only the rows of tables still waiting
+        for a section are held, those of unchanged tables are never kept.
+        """
+        pending: Dict[str, List[BaseUpdater]] = {}
+        for updater in self.known_sections(warn=False):
+            table_name = updater.get_table_name()
+            if table_name not in counts:
+                continue
+            updaters = pending.setdefault(table_name, [])
+            updaters.append(updater)
+            if len(updaters) == counts[table_name]:
+                logging.info(f"MainUpdate: {table_name} changed ({len(updaters)} sections), rebuilding")
+                updaters[0].run_update(loader, updaters[1:])
+                del pending[table_name]
+        if pending:
+            raise ValueError(f"Drop table page changed while loading {', '.join(pending)}")
+
+    @staticmethod
+    def sections_hash(section_hashes: List[str]) -> str:
+        """Content hash of a table: the hashes of the sections it is built from, in order."""
+        return hashlib.sha256("".join(section_hashes).encode()).hexdigest()
@@ -1,25 +1,52 @@
 from abc import ABC, abstractmethod
-from typing import List, Any, Tuple
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+import hashlib
 import logging
-from bs4.element import Tag
 
-from database.WarframeDB import WarframeDB, batch_insert_objects
+from database.bulk_loader import BulkLoader
+from parser.drop_table.utils.commonFunctions import normalized_rows
+from parser.drop_table.utils.stream_parser import Row
 
 
 class BaseUpdater(ABC):
 
-    def __init__(self, tables: Tag):
-        self.tables = tables
+    def __init__(self, rows: Sequence[Row]):
+        # The rows of the section, see parser/drop_table/utils/stream_parser.py
+        self.rows = rows
 
-    def run_update(self) -> None:
+    def run_update(self, loader: Optional[BulkLoader] = None, others: Sequence["BaseUpdater"] = ()) -> None:
+        """
+        Replace the table with this section, in one transaction on ``loader``.
+
+        The rows of ``others``, further sections feeding the same table (the
+        bounty sections), are inserted after this section's.
+        """
+        if loader is None:
+            with BulkLoader() as loader:
+                return self.run_update(loader, others)
         logging.info(f"MainUpdate: Start updating {self.get_table_name()} ")
-        self._delete_table()
-        self._create_table()
-        items = self._parse_data()
-        self._update_data(items)
+        with loader.transaction():
+            self._delete_table(loader)
+            self._create_table(loader)
+            for updater in (self, *others):
+                updater._update_data(loader, updater._parse_data())
+            self._create_indexes(loader)
+
+    def content_hash(self) -> str:
+        """Hash of the normalized section and of the table layout it is loaded into."""
+        digest = hashlib.sha256()
+        # Indexes are part of the layout: a table carried over keeps the ones it was built with
+        indexes = [f"INDEX {', '.join(columns)}" for columns in self.get_table_indexes()]
+        for line in (type(self).__name__, *self.get_table_schema(), *self.get_columns(), *indexes):
+            digest.update(line.encode() + b"\n")
+        digest.update(b"\f")
+        for line in normalized_rows(self.rows):
+            digest.update(line.encode() + b"\n")
+        return digest.hexdigest()
 
     @abstractmethod
-    def _parse_data(self) -> List[Any]:
+    def _parse_data(self) -> Iterator[Any]:
+        """Yield the section's rows as they are parsed."""
         pass
 
     @abstractmethod
@@ -30,6 +57,10 @@ class BaseUpdater(ABC):
     def get_table_schema(self) -> List[str]:
         pass
 
+    def get_table_indexes(self) -> List[List[str]]:
+        """Columns of each secondary index, created after the bulk insert."""
+        return []
+
     @abstractmethod
     def get_columns(self) -> List[str]:
         pass
@@ -38,16 +69,17 @@ class BaseUpdater(ABC):
     def extract_values(self, item: Any) -> Tuple:
         pass
 
-    def _delete_table(self) -> None:
-        WarframeDB().drop_table(self.get_table_name())
+    def _delete_table(self, loader: BulkLoader) -> None:
+        loader.drop_table(self.get_table_name())
+
+    def _create_table(self, loader: BulkLoader) -> None:
+        loader.create_table(self.get_table_name(), self.get_table_schema())
 
-    def _create_table(self) -> None:
-        WarframeDB().create_table(self.get_table_name(), self.get_table_schema())
+    def _create_indexes(self, loader: BulkLoader) -> None:
+        for columns in self.get_table_indexes():
+            loader.create_index(self.get_table_name(), columns)
 
-    def _update_data(self, items: List[Any]) -> bool:
-        return batch_insert_objects(
-            objects=items,
-            table_name=self.get_table_name(),
-            columns=self.get_columns(),
-            value_extractor=self.extract_values
+    def _update_data(self, loader: BulkLoader, items: Iterator[Any]) -> int:
+        return loader.insert_rows(
+            self.get_table_name(), self.get_columns(), map(self.extract_values, items)
         )
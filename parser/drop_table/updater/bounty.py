@@ -1,10 +1,9 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
-from bs4.element import Tag
-
-from parser.drop_table.utils.commonParser import parse_three_cell_prize, strip_text
+from parser.drop_table.utils.commonParser import parse_three_cell_prize
 from parser.drop_table.utils.commonFunctions import is_empty_row
+from parser.drop_table.utils.stream_parser import Row
 from .base_updater import BaseUpdater
 
 
@@ -39,43 +38,44 @@ class UpdateBountyReward(BaseUpdater):
             'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
         ]
 
+    def get_table_indexes(self) -> List[List[str]]:
+        return [['prize']]
+
     def get_columns(self) -> List[str]:
         return ['prize', 'rotation', 'stage', 'rarity', 'drop_rate', 'source']
 
     def extract_values(self, reward: BountyReward) -> Tuple:
         return reward.prize, reward.rotation, reward.stage, reward.rarity, reward.drop_rate, reward.source
 
-    def _parse_data(self) -> List[BountyReward]:
-        items: List[BountyReward] = []
+    def _parse_data(self) -> Iterator[BountyReward]:
         source = rotation = stage = ""
 
-        def handle_header_row(th_row: Tag):
+        def handle_header_row(th_row: Row):
             nonlocal source, rotation, stage
-            ths = th_row.find_all('th')
+            ths = th_row.headers
             # Header types can be:
             # - Level X - Y Cetus Bounty (colspan=3) -> source
             # - Rotation A (colspan=3) -> rotation
             # - Stage X (colspan=2) -> stage, often preceded by a pad cell td
-            text = strip_text(ths[0]) if ths else ''
+            text = ths[0] if ths else ''
             if 'Rotation' in text:
                 rotation = text
             elif 'Stage' in text:
                 # The stage header can be in second th if a pad-cell td exists
-                stage = strip_text(ths[-1])
+                stage = ths[-1]
             else:
                 source = text
 
-        for row in self.tables.find_all('tr'):
-            if row.find('th'):
+        for row in self.rows:
+            if row.headers:
                 handle_header_row(row)
             elif not is_empty_row(row):
-                prize, rarity, drop_rate = parse_three_cell_prize(row.find('td'))
-                items.append(BountyReward(
+                prize, rarity, drop_rate = parse_three_cell_prize(row)
+                yield BountyReward(
                     source=source,
                     rotation=rotation,
                     stage=stage,
                     prize=prize,
                     rarity=rarity,
                     drop_rate=drop_rate
-                ))
-        return items
+                )
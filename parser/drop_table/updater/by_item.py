@@ -1,10 +1,9 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
-from bs4.element import Tag
-
-from parser.drop_table.utils.commonParser import strip_text, parse_row_source_chance
+from parser.drop_table.utils.commonParser import parse_row_source_chance
 from parser.drop_table.utils.commonFunctions import is_empty_row
+from parser.drop_table.utils.stream_parser import Row
 from .base_updater import BaseUpdater
 
 
@@ -38,35 +37,33 @@ class GenericByItemUpdater(BaseUpdater):
     def extract_values(self, reward: ByItemReward) -> Tuple:
         return reward.item, reward.source, reward.rarity, reward.drop_rate
 
-    def _parse_data(self) -> List[ByItemReward]:
-        items: List[ByItemReward] = []
+    def _parse_data(self) -> Iterator[ByItemReward]:
         current_item = ''
 
-        def handle_header_row(th_row: Tag):
+        def handle_header_row(th_row: Row):
             nonlocal current_item
-            ths = th_row.find_all('th')
+            ths = th_row.headers
             if not ths:
                 return
             # For item sections, headers appear as <th colspan="3">Item Name</th>
             # or a column-name header row which we ignore (contains 'Source')
-            header_text = strip_text(ths[0])
+            header_text = ths[0]
             if 'Source' in header_text:
                 return
             current_item = header_text
 
-        for row in self.tables.find_all('tr'):
-            if row.find('th'):
+        for row in self.rows:
+            if row.headers:
                 handle_header_row(row)
             elif not is_empty_row(row):
                 # Row structure: [source] [drop_table chance] [rarity%]
-                source, rarity, drop_rate = parse_row_source_chance(row.find('td'))
-                items.append(ByItemReward(
+                source, rarity, drop_rate = parse_row_source_chance(row)
+                yield ByItemReward(
                     item=current_item,
                     source=source,
                     rarity=rarity,
                     drop_rate=drop_rate
-                ))
-        return items
+                )
 
 
 class UpdateModByMod(GenericByItemUpdater):
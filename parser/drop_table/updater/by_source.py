@@ -1,10 +1,9 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
-from bs4.element import Tag
-
-from parser.drop_table.utils.commonParser import parse_three_cell_prize, strip_text
+from parser.drop_table.utils.commonParser import parse_three_cell_prize
 from parser.drop_table.utils.commonFunctions import is_empty_row
+from parser.drop_table.utils.stream_parser import Row
 from .base_updater import BaseUpdater
 
 
@@ -38,30 +37,28 @@ class GenericBySourceUpdater(BaseUpdater):
     def extract_values(self, reward: BySourceReward) -> Tuple:
         return reward.item, reward.rarity, reward.drop_rate, reward.source
 
-    def _parse_data(self) -> List[BySourceReward]:
-        items: List[BySourceReward] = []
+    def _parse_data(self) -> Iterator[BySourceReward]:
         current_source = ''
 
-        def handle_header_row(th_row: Tag):
+        def handle_header_row(th_row: Row):
             nonlocal current_source
-            ths = th_row.find_all('th')
+            ths = th_row.headers
             if not ths:
                 return
             # first th is the source name; second th (if present) is "<Type> Drop Chance: X%" which we ignore
-            current_source = strip_text(ths[0])
+            current_source = ths[0]
 
-        for row in self.tables.find_all('tr'):
-            if row.find('th'):
+        for row in self.rows:
+            if row.headers:
                 handle_header_row(row)
             elif not is_empty_row(row):
-                item, rarity, drop_rate = parse_three_cell_prize(row.find('td'))
-                items.append(BySourceReward(
+                item, rarity, drop_rate = parse_three_cell_prize(row)
+                yield BySourceReward(
                     source=current_source,
                     item=item,
                     rarity=rarity,
                     drop_rate=drop_rate
-                ))
-        return items
+                )
 
 
 class UpdateModBySource(GenericBySourceUpdater):
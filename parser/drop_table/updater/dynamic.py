@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
-from parser.drop_table.utils.commonParser import parse_two_cell_prize, strip_text
+from parser.drop_table.utils.commonParser import parse_two_cell_prize
 from parser.drop_table.utils.commonFunctions import is_empty_row
 from .base_updater import BaseUpdater
 
@@ -31,31 +31,32 @@ class UpdateDynamicLocationReward(BaseUpdater):
             'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
         ]
 
+    def get_table_indexes(self) -> List[List[str]]:
+        return [['prize']]
+
     def get_columns(self) -> List[str]:
         return ['prize', 'rotation', 'rarity', 'drop_rate', 'source']
 
     def extract_values(self, reward: DynamicLocationReward) -> Tuple:
         return reward.prize, reward.rotation, reward.rarity, reward.drop_rate, reward.source
 
-    def _parse_data(self) -> List[DynamicLocationReward]:
-        items: List[DynamicLocationReward] = []
+    def _parse_data(self) -> Iterator[DynamicLocationReward]:
         source = rotation = ""
 
-        for row in self.tables.find_all('tr'):
-            if title := row.find('th'):
-                text = strip_text(title)
+        for row in self.rows:
+            if headers := row.headers:
+                text = headers[0]
                 # e.g., "Rotation A" or a source like "Arbitrations", "Kuva Flood"
                 if 'Rotation' in text:
                     rotation = text
                 else:
                     source = text
             elif not is_empty_row(row):
-                prize, rarity, drop_rate = parse_two_cell_prize(row.find('td'))
-                items.append(DynamicLocationReward(
+                prize, rarity, drop_rate = parse_two_cell_prize(row)
+                yield DynamicLocationReward(
                     source=source,
                     rotation=rotation,
                     prize=prize,
                     rarity=rarity,
                     drop_rate=drop_rate
-                ))
-        return items
+                )
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
-from parser.drop_table.utils.commonParser import parse_two_cell_prize, strip_text
+from parser.drop_table.utils.commonParser import parse_two_cell_prize
 from parser.drop_table.utils.commonFunctions import is_empty_row
 from .base_updater import BaseUpdater
 
@@ -31,30 +31,31 @@ class UpdateKeyReward(BaseUpdater):
             'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
         ]
 
+    def get_table_indexes(self) -> List[List[str]]:
+        return [['prize']]
+
     def get_columns(self) -> List[str]:
         return ['prize', 'rotation', 'rarity', 'drop_rate', 'source']
 
     def extract_values(self, reward: KeyReward) -> Tuple:
         return reward.prize, reward.rotation, reward.rarity, reward.drop_rate, reward.source
 
-    def _parse_data(self) -> List[KeyReward]:
-        items: List[KeyReward] = []
+    def _parse_data(self) -> Iterator[KeyReward]:
         source = rotation = ""
 
-        for row in self.tables.find_all('tr'):
-            if title := row.find('th'):
-                text = strip_text(title)
+        for row in self.rows:
+            if headers := row.headers:
+                text = headers[0]
                 if 'Rotation' in text:
                     rotation = text
                 else:
                     source = text
             elif not is_empty_row(row):
-                prize, rarity, drop_rate = parse_two_cell_prize(row.find('td'))
-                items.append(KeyReward(
+                prize, rarity, drop_rate = parse_two_cell_prize(row)
+                yield KeyReward(
                     source=source,
                     rotation=rotation,
                     prize=prize,
                     rarity=rarity,
                     drop_rate=drop_rate
-                ))
-        return items
+                )
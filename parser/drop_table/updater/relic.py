@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
-from parser.drop_table.utils.commonParser import parse_two_cell_prize, strip_text
+from parser.drop_table.utils.commonParser import parse_two_cell_prize
 from parser.drop_table.utils.commonFunctions import is_empty_row
 from .base_updater import BaseUpdater
 
@@ -32,29 +32,30 @@ class UpdateRelicReward(BaseUpdater):
             'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
         ]
 
+    def get_table_indexes(self) -> List[List[str]]:
+        return [['prize', 'relic'], ['relic']]
+
     def get_columns(self) -> List[str]:
         return ['prize', 'radiant', 'rarity', 'drop_rate', 'relic']
 
     def extract_values(self, reward: RelicReward) -> Tuple:
         return reward.prize, reward.radiant, reward.rarity, reward.drop_rate, reward.relic
 
-    def _parse_data(self) -> List[RelicReward]:
+    def _parse_data(self) -> Iterator[RelicReward]:
         """解析聖物獎勵資料"""
-        items = []
         radiant = relic = ""
 
-        for row in self.tables.find_all('tr'):
-            if title := row.find('th'):
-                text = strip_text(title)
+        for row in self.rows:
+            if headers := row.headers:
+                text = headers[0]
                 relic, radiant = ' '.join(text.split(' ')[:-1]), text.split(' ')[-1].strip('()')
 
             elif not is_empty_row(row):
-                prize, rarity, drop_rate = parse_two_cell_prize(row.find('td'))
-                items.append(RelicReward(
+                prize, rarity, drop_rate = parse_two_cell_prize(row)
+                yield RelicReward(
                     prize=prize,
                     rarity=rarity,
                     drop_rate=drop_rate,
                     relic=relic,
                     radiant=radiant
-                ))
-        return items
+                )
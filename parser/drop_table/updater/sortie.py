@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
-from parser.drop_table.utils.commonParser import parse_two_cell_prize, strip_text
+from parser.drop_table.utils.commonParser import parse_two_cell_prize
 from parser.drop_table.utils.commonFunctions import is_empty_row
 from .base_updater import BaseUpdater
 
@@ -35,21 +35,19 @@ class UpdateSortieReward(BaseUpdater):
     def extract_values(self, reward: SortieReward) -> Tuple:
         return reward.prize, reward.rarity, reward.drop_rate, reward.source
 
-    def _parse_data(self) -> List[SortieReward]:
-        items: List[SortieReward] = []
+    def _parse_data(self) -> Iterator[SortieReward]:
         source = ""
 
-        for row in self.tables.find_all('tr'):
-            if title := row.find('th'):
+        for row in self.rows:
+            if headers := row.headers:
                 # The Sorties table has a single header like "Sortie"
-                text = strip_text(title)
+                text = headers[0]
                 source = text
             elif not is_empty_row(row):
-                prize, rarity, drop_rate = parse_two_cell_prize(row.find('td'))
-                items.append(SortieReward(
+                prize, rarity, drop_rate = parse_two_cell_prize(row)
+                yield SortieReward(
                     source=source,
                     prize=prize,
                     rarity=rarity,
                     drop_rate=drop_rate
-                ))
-        return items
+                )
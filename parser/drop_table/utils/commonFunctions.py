@@ -1,18 +1,24 @@
-import requests
-from bs4.element import Tag
+from typing import Iterable, Iterator
+
 from dotenv import load_dotenv
 
+from parser.drop_table.utils.stream_parser import Row
+
 load_dotenv()
 
 
-def is_empty_row(row: Tag) -> bool:
-    return row.get("class") and "blank-row" in row.get("class")
+def is_empty_row(row: Row) -> bool:
+    return row.blank
 
 
-def is_drop_table_available() -> bool:
-    return (
-        requests.get(
-            "https://warframe-web-assets.nyc3.cdn.digitaloceanspaces.com/uploads/cms/hnfvc0o3jnfvc873njb03enrf56.html"
-        ).status_code
-        == 200
-    )
+def normalized_rows(rows: Iterable[Row]) -> Iterator[str]:
+    """
+    One line per row of a section, what its content hash is computed over: each
+    cell as its tag name and its text with the whitespace collapsed, blank rows
+    as empty lines. Markup the parsers do not look at does not change the hash.
+    """
+    for row in rows:
+        if row.blank:
+            yield ""
+        else:
+            yield "\t".join(f"{tag}:{' '.join(text.split())}" for tag, text in row.cells)
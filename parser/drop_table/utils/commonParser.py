@@ -1,38 +1,34 @@
-from bs4.element import Tag
+from parser.drop_table.utils.stream_parser import Row
 
 
-def strip_text(text: Tag) -> str:
-    return text.get_text().strip()
-
-
-def parse_two_cell_prize(prize_tag: Tag) -> list:
-    prize_text = strip_text(prize_tag)
-    words = strip_text(prize_tag.find_next('td')).split(' ')
+def parse_two_cell_prize(row: Row) -> list:
+    """
+    Parses a 2-column data row where the structure is:
+    [item td] [rarity-with-percent td]
+    Returns [item_text, rarity_label, drop_rate_float]
+    """
+    prize_text, rarity_text = row.data[:2]
+    words = rarity_text.split(' ')
     return [prize_text, ' '.join(words[:-1]), words[-1][1:-2]]
 
 
-def parse_three_cell_prize(first_td: Tag) -> list:
+def parse_three_cell_prize(row: Row) -> list:
     """
     Parses a 3-column data row where the structure is:
     [blank-or-pad td] [item/mod/resource/etc td] [rarity-with-percent td]
     Returns [item_text, rarity_label, drop_rate_float]
     """
-    item_td = first_td.find_next('td')
-    rarity_td = item_td.find_next('td')
-    prize_text = strip_text(item_td)
-    words = strip_text(rarity_td).split(' ')
+    prize_text, rarity_text = row.data[1:3]
+    words = rarity_text.split(' ')
     return [prize_text, ' '.join(words[:-1]), words[-1][1:-2]]
 
 
-def parse_row_source_chance(first_td: Tag) -> list:
+def parse_row_source_chance(row: Row) -> list:
     """
     Parses a 3-column data row where the structure is:
     [source td] [drop_table chance td - ignored] [rarity-with-percent td]
     Returns [source_text, rarity_label, drop_rate_float]
     """
-    source_text = strip_text(first_td)
-    # skip the middle chance cell
-    chance_td = first_td.find_next('td')
-    rarity_td = chance_td.find_next('td')
-    words = strip_text(rarity_td).split(' ')
+    source_text, _, rarity_text = row.data[:3]
+    words = rarity_text.split(' ')
     return [source_text, ' '.join(words[:-1]), words[-1][1:-2]]
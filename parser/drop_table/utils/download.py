@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DROP_TABLE_URL = "https://warframe-web-assets.nyc3.cdn.digitaloceanspaces.com/uploads/cms/hnfvc0o3jnfvc873njb03enrf56.html"
+# Where the page is kept between runs, parsed from there and usable offline
+DROP_TABLE_CACHE = os.getenv("DROP_TABLE_CACHE", "data/drop_table.html")
+DOWNLOAD_TIMEOUT = 60
+CHUNK_SIZE = 64 * 1024
+
+
+def _meta_path(cache_path: str) -> str:
+    return cache_path + ".meta.json"
+
+
+def _load_meta(cache_path: str, url: str) -> Dict[str, str]:
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(_meta_path(cache_path)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return meta if meta.get("url") == url else {}
+
+
+def forget_drop_table(cache_path: str = DROP_TABLE_CACHE) -> None:
+    """Drop the stored validators, the next fetch downloads the page again."""
+    try:
+        os.remove(_meta_path(cache_path))
+    except FileNotFoundError:
+        pass
+
+
+def fetch_drop_table(
+    url: str = DROP_TABLE_URL,
+    cache_path: str = DROP_TABLE_CACHE,
+    session: Optional[requests.Session] = None,
+) -> bool:
+    """
+    Bring ``cache_path`` up to date with the drop table page, in one request.
+
+    The ``ETag`` and ``Last-Modified`` of the cached copy are sent back as
+    ``If-None-Match``/``If-Modified-Since``: an unchanged page costs a 304 and no
+    body. A changed one is streamed (gzip accepted) to a temporary file that
+    replaces the cache once complete. Return True when the cache was replaced,
+    False on 304; raise ``requests.RequestException`` when the page is unavailable.
+    """
+    meta = _load_meta(cache_path, url)
+    headers = {"Accept-Encoding": "gzip"}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    with (session or requests).get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        if response.status_code == 304 and meta:
+            logging.info("MainUpdate: Drop table not modified")
+            return False
+        response.raise_for_status()
+
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        size = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                # iter_content undoes the gzip Content-Encoding
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+    with open(_meta_path(cache_path), "w") as f:
+        json.dump(meta, f)
+    logging.info(f"MainUpdate: Drop table downloaded to {cache_path} ({size} bytes)")
+    return True
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class Row:
+    """
+    One ``<tr>`` of a drop table section.
+
+    :ivar cells: ``(tag name, stripped text)`` of each ``th``/``td``, in page order.
+    :ivar blank: The row is a ``blank-row`` separator.
+    """
+
+    cells: Tuple[Tuple[str, str], ...]
+    blank: bool = False
+
+    @property
+    def headers(self) -> List[str]:
+        return [text for tag, text in self.cells if tag == "th"]
+
+    @property
+    def data(self) -> List[str]:
+        return [text for tag, text in self.cells if tag == "td"]
+
+
+@dataclass(frozen=True)
+class Section:
+    """A ``<table>`` of the page and the text of the ``<h3>`` heading it."""
+
+    title: str
+    rows: Tuple[Row, ...]
+
+
+class DropTableParser(HTMLParser):
+    """
+    Event parser for the drop table page, keeping only the rows of the table being read.
+
+    Completed sections pile up in ``sections`` until the reader takes them; text
+    outside cells and headings is never stored, nor is any element tree.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # The text right before the first <h3>, which is the page date
+        self.date: Optional[str] = None
+        self.sections: List[Section] = []
+        # Text since the last tag, which one feed may hand over in several pieces
+        self._last_text = ""
+        self._title = ""
+        self._heading: Optional[List[str]] = None
+        self._rows: Optional[List[Row]] = None
+        self._cells: Optional[List[Tuple[str, str]]] = None
+        self._blank = False
+        self._cell: Optional[Tuple[str, List[str]]] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        last_text, self._last_text = self._last_text, ""
+        if tag == "h3":
+            if self.date is None:
+                self.date = last_text.strip()
+            self._heading = []
+        elif tag == "table":
+            self._rows = []
+        elif tag == "tr" and self._rows is not None:
+            self._end_row()
+            self._cells = []
+            self._blank = "blank-row" in (dict(attrs).get("class") or "").split()
+        elif tag in ("td", "th") and self._cells is not None:
+            self._end_cell()
+            self._cell = (tag, [])
+
+    def handle_endtag(self, tag: str) -> None:
+        self._last_text = ""
+        if tag == "h3" and self._heading is not None:
+            self._title = "".join(self._heading)
+            self._heading = None
+        elif tag in ("td", "th"):
+            self._end_cell()
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "table" and self._rows is not None:
+            self._end_row()
+            self.sections.append(Section(self._title, tuple(self._rows)))
+            self._rows = None
+
+    def handle_data(self, data: str) -> None:
+        self._last_text += data
+        if self._cell is not None:
+            self._cell[1].append(data)
+        elif self._heading is not None:
+            self._heading.append(data)
+
+    def _end_cell(self) -> None:
+        if self._cell is not None:
+            self._cells.append((self._cell[0], "".join(self._cell[1]).strip()))
+            self._cell = None
+
+    def _end_row(self) -> None:
+        self._end_cell()
+        if self._cells is not None:
+            self._rows.append(Row(tuple(self._cells), self._blank))
+            self._cells = None
+
+    def take_sections(self) -> List[Section]:
+        sections, self.sections = self.sections, []
+        return sections
+
+
+def parse_sections(chunks: Iterable[str]) -> Iterator[Section]:
+    """Yield the sections of the page fed as ``chunks``, each as soon as its table closes."""
+    parser = DropTableParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.take_sections()
+    parser.close()
+    yield from parser.take_sections()
+
+
+class DropTablePage:
+    """
+    The drop table page saved at ``path``, read in ``chunk_size`` pieces.
+
+    Unlike a whole-document BeautifulSoup tree, nothing but the rows of the
+    sections still in use is kept in memory.
+    """
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def _chunks(self) -> Iterator[str]:
+        with open(self.path, encoding="utf-8") as f:
+            while chunk := f.read(self.chunk_size):
+                yield chunk
+
+    def read_date(self) -> str:
+        """The page date text, reading the page only up to the first ``<h3>``."""
+        parser = DropTableParser()
+        for chunk in self._chunks():
+            parser.feed(chunk)
+            if parser.date is not None:
+                return parser.date
+        raise ValueError(f"No <h3> in {self.path}")
+
+    def sections(self) -> Iterator[Section]:
+        return parse_sections(self._chunks())
@@ -0,0 +1,81 @@
+"""
+Requests per second through the middleware stack, in process.
+
+Compares the current pure ASGI middlewares with the previous
+``BaseHTTPMiddleware`` rate limiter, both in front of the real routers and
+serving a cached /prime/status. Not collected by pytest, run it directly:
+
+    python -m test.backend.benchmark_middleware [requests]
+"""
+import logging
+import sys
+import time
+
+import anyio
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend.helper.encoded_response import encode_json
+from backend.helper.rate_limit import TokenBucketLimiter
+from backend.main import RateLimiterMiddleware, TimingMiddleware, include_all_routers
+from backend.prime import status
+
+UNLIMITED = 10**9
+
+
+class LegacyRateLimiterMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, limiter: TokenBucketLimiter):
+        super().__init__(app)
+        self.limiter = limiter
+
+    async def dispatch(self, request: Request, call_next):
+        xff = request.headers.get("x-forwarded-for")
+        client_id = xff.split(",")[0].strip() if xff else request.client.host
+        self.limiter.hit(client_id)
+        return await call_next(request)
+
+
+def make_app(asgi: bool) -> FastAPI:
+    app = FastAPI()
+    if asgi:
+        app.add_middleware(TimingMiddleware)
+        app.add_middleware(RateLimiterMiddleware, limiter=TokenBucketLimiter.per_minute(UNLIMITED))
+    else:
+        app.add_middleware(
+            LegacyRateLimiterMiddleware, limiter=TokenBucketLimiter.per_minute(UNLIMITED)
+        )
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["GET", "POST"])
+    include_all_routers(app, "backend")
+    return app
+
+
+async def requests_per_second(app: FastAPI, count: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):
+            await client.get("/prime/status")
+        start = time.perf_counter()
+        for _ in range(count):
+            response = await client.get("/prime/status")
+            assert response.status_code == 200
+        return count / (time.perf_counter() - start)
+
+
+def main(count: int) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Serve a warm cache, so the numbers are about the request path only
+    status.get_data_version = lambda: 1
+    status._CACHE.update(
+        body=encode_json([{"warframe_set": "Set", "parts": []}] * 50, "prime-status-1"),
+        last_update=1,
+        ts=time.time(),
+    )
+    for name, asgi in (("BaseHTTPMiddleware", False), ("pure ASGI", True)):
+        rps = anyio.run(requests_per_second, make_app(asgi), count)
+        print(f"{name:>20}: {rps:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -1,6 +1,18 @@
+import pytest
 from fastapi.testclient import TestClient
 
-from backend.decode import decode_bitmap, decode_list
+from backend.decode import (
+    MAX_DECODED_ID,
+    NUMPY_MIN_BYTES,
+    bitmap_ids,
+    decode_bitmap,
+    decode_delta,
+    decode_ids,
+    decode_list,
+    decode_runs,
+    decode_varints,
+)
+from backend.encode import encode_bitmap, encode_delta, encode_list, encode_runs
 from backend.main import app
 
 client = TestClient(app)
@@ -26,6 +38,44 @@ class TestDecodeFunctions:
         result = decode_bitmap("")
         assert result == []
 
+    @pytest.mark.parametrize("size", [1, NUMPY_MIN_BYTES, 4096])
+    def test_bitmap_ids_matches_bit_by_bit_decoding(self, size):
+        raw = bytes((i * 37) % 256 for i in range(size))
+        expected = [i for i in range(size * 8) if raw[i // 8] >> (i % 8) & 1]
+        assert bitmap_ids(raw) == expected
+
+    def test_decode_delta_returns_correct_decoding_for_valid_input(self):
+        result = decode_delta("DAQAAfgA"[1:])
+        assert result == [1, 2, 3, 130, 131]
+
+    def test_decode_runs_returns_correct_decoding_for_valid_input(self):
+        result = decode_runs("RAQJ-AQ"[1:])
+        assert result == [1, 2, 3, 130, 131]
+
+    def test_decode_varints_rejects_truncated_input(self):
+        with pytest.raises(ValueError):
+            decode_varints(b"\x81")
+
+    def test_decode_varints_rejects_overlong_varints(self):
+        with pytest.raises(ValueError):
+            decode_varints(b"\xff" * 10000 + b"\x01")
+
+    def test_decode_runs_rejects_runs_past_the_id_range(self):
+        with pytest.raises(ValueError):
+            decode_runs(encode_runs(list(range(MAX_DECODED_ID - 1, MAX_DECODED_ID + 1)))[1:])
+
+    def test_decode_delta_rejects_ids_past_the_id_range(self):
+        assert decode_delta(encode_delta([MAX_DECODED_ID - 1])[1:]) == [MAX_DECODED_ID - 1]
+        with pytest.raises(ValueError):
+            decode_delta(encode_delta([MAX_DECODED_ID])[1:])
+
+    @pytest.mark.parametrize(
+        "ids", [[0], [7, 8, 9, 10], [1, 5, 1000, 1001, 1002, 70000], list(range(0, 3000, 3))]
+    )
+    def test_every_codec_round_trips(self, ids):
+        for encoded in (encode_bitmap(ids), encode_list(ids), encode_delta(ids), encode_runs(ids)):
+            assert decode_ids(encoded) == ids
+
 
 class TestDecodeAPI:
     def test_decode_data_returns_decoded_bitmap_for_bitmap_input(self):
@@ -45,6 +95,39 @@ class TestDecodeAPI:
         assert response.status_code == 200
         assert response.json()["data"] == []
 
+    def test_decode_data_returns_decoded_runs_for_runs_input(self):
+        response = client.post(decode_path, json={"data": "RiCfnBw"})
+        assert response.status_code == 200
+        assert response.json()["data"] == list(range(5000, 6000))
+
+    def test_decode_data_raises_error_for_invalid_payload(self):
+        response = client.post(decode_path, json={"data": "D6"})
+        assert response.status_code == 400
+
     def test_decode_data_raises_error_for_invalid_format(self):
         response = client.post(decode_path, json={"data": "X123"})
         assert response.status_code == 400
+
+
+class TestDecodeBatchAPI:
+    batch_path = "/decode/batch"
+
+    def test_decode_batch_matches_single_decodes(self):
+        payloads = ["BQA", "LMSwyLDM", "", "RiCfnBw", "D6Ac", "BQA"]
+
+        response = client.post(self.batch_path, json={"data": payloads})
+
+        assert response.status_code == 200
+        assert response.json()["data"] == [
+            client.post(decode_path, json={"data": p}).json()["data"] for p in payloads
+        ]
+
+    def test_decode_batch_reports_invalid_payload(self):
+        response = client.post(self.batch_path, json={"data": ["BQA", "X123"]})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Input invalid format (wishlist 1)"
+
+    def test_decode_batch_rejects_too_many_wishlists(self, monkeypatch):
+        monkeypatch.setattr("backend.decode.CODEC_BATCH_LIMIT", 2)
+        response = client.post(self.batch_path, json={"data": ["BQA", "BQA", "BQA"]})
+        assert response.status_code == 400
@@ -1,6 +1,16 @@
+import time
+
+import anyio
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
+from backend.decode import MAX_DECODED_ID
+from backend.drop import graph
+from backend.drop.cache import SearchResultCache
+from backend.drop.search import DropSearchService
+from backend.encode import encode_delta
+from backend.helper import json_response
 from backend.main import app
 
 client = TestClient(app)
@@ -8,34 +18,49 @@ client = TestClient(app)
 
 class TestDropSearchAPI:
     search_url = "/drop/search"
-    fetchall_attr = "backend.drop.search.fetchall"
-    get_available_sets_attr = "backend.drop.search.get_available_sets"
+    batch_url = "/drop/search/batch"
+    cache_url = "/drop/search/cache"
+    fetchall_attrs = ["backend.drop.graph.fetchall", "backend.drop.graph.fetchall_in"]
 
+    mock_vault_status = [("Set1",), ("Set2",)]
     mock_prime_parts = [
-        ("Set1", "PartA"),
-        ("Set2", "PartB"),
+        (1, "Set1", "PartA"),
+        (2, "Set2", "PartB"),
     ]
+    mock_derived_tables = [("part_relic_best",), ("relic_source_scores",)]
     mock_relic_rewards = [
         ("Set1 Prime PartA", "Radiant", 0.1, "Relic1"),
         ("Set2 Prime PartB", "Intact", 0.2, "Relic2"),
     ]
     mock_reward_tables = [
-        ("Relic1", 0.5, "Source1", "Rotation A"),
-        ("Relic2", 0.3, "Source2", "Rotation B"),
+        ("Relic1", 0.5, "Source1", "A"),
+        ("Relic2", 0.3, "Source2", "B"),
     ]
 
-    def test_search_drop_success(self, monkeypatch):
-        def mock_fetchall(query, params=None):
-            if "prime_parts" in query:
-                return self.mock_prime_parts
-            if "relic_rewards" in query:
-                return self.mock_relic_rewards
-            # This will be called for each table in RewardTables.TABLES
-            # We can simplify by returning the same data for all.
-            return self.mock_reward_tables
+    @pytest.fixture(autouse=True)
+    def reset_graph_cache(self, monkeypatch):
+        # The graph and results are cached per last_update, which is 0 for every test here
+        monkeypatch.setitem(graph._CACHE, "graph", None)
+        self.result_cache = SearchResultCache()
+        monkeypatch.setattr("backend.drop.search.search_result_cache", self.result_cache)
 
-        monkeypatch.setattr(self.fetchall_attr, mock_fetchall)
-        monkeypatch.setattr(self.get_available_sets_attr, lambda: ["Set1", "Set2"])
+    def patch_fetchall(self, monkeypatch, mock):
+        for attr in self.fetchall_attrs:
+            monkeypatch.setattr(attr, mock)
+
+    def mock_fetchall(self, query, params=None):
+        if "sqlite_master" in query:
+            return self.mock_derived_tables
+        if "vault_status" in query:
+            return self.mock_vault_status
+        if "prime_parts" in query:
+            return self.mock_prime_parts
+        if "part_relic_best" in query:
+            return self.mock_relic_rewards
+        return self.mock_reward_tables
+
+    def test_search_drop_success(self, monkeypatch):
+        self.patch_fetchall(monkeypatch, self.mock_fetchall)
 
         response = client.post(self.search_url, json={"data": [1, 2]})
 
@@ -52,6 +77,219 @@ class TestDropSearchAPI:
         assert "Source1" in data["area_score"]
         assert data["area_score"]["Source1"]["score"] > 0
 
+    def test_search_drop_accepts_encoded_wishlist(self, monkeypatch):
+        self.patch_fetchall(monkeypatch, self.mock_fetchall)
+
+        expected = client.post(self.search_url, json={"data": [1, 2]}).json()
+        # "BBg" is the bitmap of [1, 2], "LMSwy", "DAQA" and "RAQE" the list, delta
+        # and run encodings of the same IDs
+        for encoded in ["BBg", "LMSwy", "DAQA", "RAQE"]:
+            response = client.post(self.search_url, json={"data": encoded})
+            assert response.status_code == 200
+            assert response.json() == expected
+
+    def test_search_drop_uses_dense_ids_of_item_id_map(self, monkeypatch):
+        def mock_fetchall(query, params=None):
+            if "sqlite_master" in query:
+                return self.mock_derived_tables + [("item_id_map",)]
+            if "MAX(version)" in query:
+                return [(1,)]
+            if "item_id_map" in query:
+                # Dense ID 0 is part 2, dense ID 1 part 1
+                return [(2,), (1,)]
+            return self.mock_fetchall(query, params)
+
+        self.patch_fetchall(monkeypatch, self.mock_fetchall)
+        expected = client.post(self.search_url, json={"data": [1, 2]}).json()
+        monkeypatch.setitem(graph._CACHE, "graph", None)
+        self.result_cache.clear()
+        self.patch_fetchall(monkeypatch, mock_fetchall)
+
+        # "M1.BAw" is the bitmap of dense IDs [0, 1], "M1.BAg" of dense ID 1 (part 1)
+        for data in [[1, 2], "BBg", "M1.BAw"]:
+            response = client.post(self.search_url, json={"data": data})
+            assert response.status_code == 200
+            assert response.json() == expected
+        assert graph._CACHE["graph"].map_version == 1
+        response = client.post(self.search_url, json={"data": "M1.BAg"})
+        assert list(response.json()["relic_score"]) == ["Relic1"]
+
+    def test_search_drop_ignores_mapped_ids_past_the_map(self, monkeypatch):
+        def mock_fetchall(query, params=None):
+            if "sqlite_master" in query:
+                return self.mock_derived_tables + [("item_id_map",)]
+            if "MAX(version)" in query:
+                return [(1,)]
+            if "item_id_map" in query:
+                return [(2,), (1,)]
+            return self.mock_fetchall(query, params)
+
+        self.patch_fetchall(monkeypatch, mock_fetchall)
+
+        # Dense IDs [1, MAX_DECODED_ID - 1] delta encoded: only dense ID 1 (part 1) is known
+        data = "M1." + encode_delta([1, MAX_DECODED_ID - 1])
+        response = client.post(self.search_url, json={"data": data})
+        assert response.status_code == 200
+        assert list(response.json()["relic_score"]) == ["Relic1"]
+        # The IDs are packed against the graph, not into a bitmap as long as the largest one
+        service = DropSearchService.from_encoded(data)
+        assert service.item_bitmap is None
+        assert len(service.part_bitmap(graph._CACHE["graph"])) == 1
+
+    def test_search_drop_skips_vaulted_parts(self, monkeypatch):
+        monkeypatch.setattr(self, "mock_vault_status", [("Set1",)])
+        self.patch_fetchall(monkeypatch, self.mock_fetchall)
+
+        response = client.post(self.search_url, json={"data": "BBg"})
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data["relic_score"]) == ["Relic1"]
+
+    def test_search_drop_batch_matches_single_searches(self, monkeypatch):
+        self.patch_fetchall(monkeypatch, self.mock_fetchall)
+
+        wishlists = [[1, 2], "BBg", [2], []]
+        response = client.post(self.batch_url, json={"data": wishlists})
+        assert response.status_code == 200
+        data = response.json()
+
+        assert list(data) == ["0", "1", "2", "3"]
+        for i, wishlist in enumerate(wishlists):
+            single = client.post(self.search_url, json={"data": wishlist}).json()
+            assert data[str(i)] == single
+        assert list(data["2"]["relic_score"]) == ["Relic2"]
+
+    def test_search_drop_batch_rejects_too_many_wishlists(self, monkeypatch):
+        monkeypatch.setattr("backend.drop.search.SEARCH_BATCH_LIMIT", 2)
+        response = client.post(self.batch_url, json={"data": [[1], [2], [3]]})
+        assert response.status_code == 400
+
+    def test_search_drop_derives_tables_when_missing(self, monkeypatch):
+        queries = []
+
+        def mock_fetchall(query, params=None):
+            queries.append(query)
+            if "sqlite_master" in query:
+                return []
+            if "GROUP BY prize, relic" in query:
+                return self.mock_relic_rewards
+            return self.mock_fetchall(query, params)
+
+        self.patch_fetchall(monkeypatch, mock_fetchall)
+
+        response = client.post(self.search_url, json={"data": [1, 2]})
+        assert response.status_code == 200
+        assert "Source1" in response.json()["area_score"]
+        # Databases ingested before the derived tables existed aggregate the raw tables
+        assert any("FROM (" in query and "GROUP BY prize, relic" in query for query in queries)
+
+    def test_search_drop_caches_results_per_version(self, monkeypatch):
+        self.patch_fetchall(monkeypatch, self.mock_fetchall)
+
+        first = client.post(self.search_url, json={"data": [2, 1, 2]}).json()
+        # Same parts in another order and encoding share the cache entry
+        second = client.post(self.search_url, json={"data": "BBg"}).json()
+        assert first == second
+        stats = client.get(self.cache_url).json()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+        # A new drop table drops the whole cache
+        monkeypatch.setattr("backend.drop.graph.get_data_version", lambda: 1)
+        client.post(self.search_url, json={"data": [1, 2]})
+        stats = client.get(self.cache_url).json()
+        assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+        assert stats["version"] == 1
+
+    def test_search_drop_serializes_results_once(self, monkeypatch):
+        self.patch_fetchall(monkeypatch, self.mock_fetchall)
+        encoded = []
+
+        def timed_dumps(content):
+            encoded.append(content)
+            return json_response.timed_dumps(content)
+
+        monkeypatch.setattr("backend.drop.search.timed_dumps", timed_dumps)
+        single = client.post(self.search_url, json={"data": [1, 2]})
+        batch = client.post(self.batch_url, json={"data": [[1, 2], "BBg"]})
+
+        assert len(encoded) == 1
+        assert self.result_cache.stats()["bytes"] == len("BBg") + len(single.content)
+        assert batch.json() == {"0": single.json(), "1": single.json()}
+
+    def test_search_drop_shares_graph_snapshot_between_workers(self, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.helper.snapshot.SNAPSHOT_DIR", str(tmp_path))
+        self.patch_fetchall(monkeypatch, self.mock_fetchall)
+        expected = client.post(self.search_url, json={"data": [1, 2]}).json()
+
+        # Another worker: nothing cached in process, the DB must not be queried
+        monkeypatch.setitem(graph._CACHE, "graph", None)
+        self.result_cache.clear()
+        self.patch_fetchall(monkeypatch, lambda *args, **kwargs: pytest.fail("DB queried"))
+        response = client.post(self.search_url, json={"data": [1, 2]})
+
+        assert response.status_code == 200
+        assert response.json() == expected
+
+    def test_search_result_cache_evicts_least_recently_used(self):
+        cache = SearchResultCache(max_entries=2)
+        for key in ["a", "b"]:
+            cache.put(key, 0, b'{"relic_score":{},"area_score":{}}')
+        cache.get("a", 0)
+        cache.put("c", 0, b'{"relic_score":{},"area_score":{}}')
+
+        assert cache.get("b", 0) is None
+        assert cache.get("a", 0) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_search_drop_does_not_block_other_requests(self, monkeypatch):
+        def slow_search(self):
+            time.sleep(0.5)
+            return b'{"relic_score":{},"area_score":{}}'
+
+        monkeypatch.setattr("backend.drop.search.DropSearchService.process_search", slow_search)
+        finished = []
+
+        async def post(http, url, data):
+            await http.post(url, json={"data": data})
+            finished.append(url)
+
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                async with anyio.create_task_group() as tg:
+                    tg.start_soon(post, http, self.search_url, [1])
+                    await anyio.sleep(0.1)
+                    tg.start_soon(post, http, "/encode", [1])
+
+        anyio.run(main)
+        assert finished == ["/encode", self.search_url]
+
+    @pytest.mark.parametrize("url, data", [(search_url, "BBg"), (batch_url, ["BBg"])])
+    def test_search_drop_decodes_off_the_event_loop(self, monkeypatch, url, data):
+        def slow_decode(cls, encoded):
+            time.sleep(0.5)
+            return cls([])
+
+        monkeypatch.setattr(
+            "backend.drop.search.DropSearchService.from_encoded", classmethod(slow_decode)
+        )
+        finished = []
+
+        async def post(http, url, data):
+            await http.post(url, json={"data": data})
+            finished.append(url)
+
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                async with anyio.create_task_group() as tg:
+                    tg.start_soon(post, http, url, data)
+                    await anyio.sleep(0.1)
+                    tg.start_soon(post, http, "/encode", [1])
+
+        anyio.run(main)
+        assert finished == ["/encode", url]
+
     def test_search_drop_empty_input(self):
         response = client.post(self.search_url, json={"data": []})
         assert response.status_code == 200
@@ -59,8 +297,7 @@ class TestDropSearchAPI:
         assert data == {"relic_score": {}, "area_score": {}}
 
     def test_search_drop_no_results(self, monkeypatch):
-        monkeypatch.setattr(self.fetchall_attr, lambda *args, **kwargs: [])
-        monkeypatch.setattr(self.get_available_sets_attr, lambda: [])
+        self.patch_fetchall(monkeypatch, lambda *args, **kwargs: [])
 
         response = client.post(self.search_url, json={"data": [1, 2]})
         assert response.status_code == 200
@@ -71,8 +308,7 @@ class TestDropSearchAPI:
         def raise_exception(*args, **kwargs):
             raise ConnectionError("Database error")
 
-        monkeypatch.setattr(self.fetchall_attr, raise_exception)
-        monkeypatch.setattr(self.get_available_sets_attr, lambda: ["Set1"])
+        self.patch_fetchall(monkeypatch, raise_exception)
 
         response = client.post(self.search_url, json={"data": [1]})
         assert response.status_code == 400  # The API returns 400 for any exception
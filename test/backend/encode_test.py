@@ -1,6 +1,14 @@
+import pytest
 from fastapi.testclient import TestClient
 
-from backend.encode import encode_bitmap, encode_list
+from backend.encode import (
+    NUMPY_MIN_IDS,
+    bitmap_bytes,
+    encode_bitmap,
+    encode_delta,
+    encode_list,
+    encode_runs,
+)
 from backend.main import app
 
 client = TestClient(app)
@@ -18,6 +26,18 @@ class TestEncodeFunctions:
         result = encode_bitmap([])
         assert result == ""
 
+    @pytest.mark.parametrize("size", [3, NUMPY_MIN_IDS, 5000])
+    def test_bitmap_bytes_sets_one_bit_per_id(self, size):
+        ids = list(range(0, size * 3, 3))
+        raw = bitmap_bytes(ids)
+        assert len(raw) == ids[-1] // 8 + 1
+        assert [i for i in range(len(raw) * 8) if raw[i // 8] >> (i % 8) & 1] == ids
+
+    @pytest.mark.parametrize("size", [3, NUMPY_MIN_IDS])
+    def test_bitmap_bytes_rejects_negative_ids(self, size):
+        with pytest.raises(ValueError):
+            bitmap_bytes(list(range(size)) + [-1])
+
     def test_encode_list_returns_correct_encoding_for_non_empty_list(self):
         result = encode_list([1, 2, 3])
         assert result == "LMSwyLDM"
@@ -26,6 +46,16 @@ class TestEncodeFunctions:
         result = encode_list([])
         assert result == "L"
 
+    def test_encode_delta_returns_varint_gaps(self):
+        # gaps [1, 0, 0, 126, 0] -> b'\x01\x00\x00\x7e\x00'
+        result = encode_delta([1, 2, 3, 130, 131])
+        assert result == "DAQAAfgA"
+
+    def test_encode_runs_returns_gap_length_pairs(self):
+        # runs 1-3 and 130-131 -> (1, 2), (126, 1) -> b'\x01\x02\x7e\x01'
+        result = encode_runs([1, 2, 3, 130, 131])
+        assert result == "RAQJ-AQ"
+
 
 class TestEncodeAPI:
     def test_encode_data_returns_bitmap_when_shorter(self):
@@ -34,15 +64,50 @@ class TestEncodeAPI:
         assert response.status_code == 200
         assert response.json()["data"] == "BDg"
 
-    def test_encode_data_returns_list_when_shorter(self):
-        # For a sparse list, list encoding is shorter.
-        # encode_list([1000]) -> "LMTAwMA" (len 7)
+    def test_encode_data_returns_delta_when_shorter(self):
+        # For a sparse list, delta encoding is shorter.
+        # encode_delta([1000]) -> "D6Ac" (len 4), encode_list([1000]) -> "LMTAwMA" (len 7)
         # encode_bitmap([1000]) -> is much more longer.
         response = client.post(encode_path, json={"data": [1000]})
         assert response.status_code == 200
-        assert response.json()["data"] == "LMTAwMA"
+        assert response.json()["data"] == "D6Ac"
+
+    def test_encode_data_returns_runs_when_shorter(self):
+        # One run of 1000 IDs from 5000: "R" + varints (5000, 999) -> "RiCfnBw"
+        response = client.post(encode_path, json={"data": list(range(5000, 6000))})
+        assert response.status_code == 200
+        assert response.json()["data"] == "RiCfnBw"
+
+    def test_encode_data_handles_sparse_high_ids(self):
+        response = client.post(encode_path, json={"data": [10**12]})
+        assert response.status_code == 200
+        assert response.json()["data"][0] == "D"
 
     def test_encode_data_returns_empty_string_for_empty_list(self):
         response = client.post(encode_path, json={"data": []})
         assert response.status_code == 200
         assert response.json()["data"] == ""
+
+
+class TestEncodeBatchAPI:
+    batch_path = "/encode/batch"
+
+    def test_encode_batch_matches_single_encodes(self):
+        wishlists = [[1, 2, 3], [1000], [], list(range(5000, 6000)), [3, 2, 1]]
+
+        response = client.post(self.batch_path, json={"data": wishlists})
+
+        assert response.status_code == 200
+        assert response.json()["data"] == [
+            client.post(encode_path, json={"data": w}).json()["data"] for w in wishlists
+        ]
+
+    def test_encode_batch_rejects_negative_ids(self):
+        response = client.post(self.batch_path, json={"data": [[1], [2, -1]]})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "All numbers must be non-negative (wishlist 1)"
+
+    def test_encode_batch_rejects_too_many_wishlists(self, monkeypatch):
+        monkeypatch.setattr("backend.encode.CODEC_BATCH_LIMIT", 2)
+        response = client.post(self.batch_path, json={"data": [[1], [2], [3]]})
+        assert response.status_code == 400
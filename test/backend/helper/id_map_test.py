@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.encode import encode_list
+from backend.helper import id_map
+from backend.helper.id_map import ItemIdMap
+from backend.main import app
+from database.utils.id_map import update_item_id_map
+
+client = TestClient(app)
+
+# Parts 1000-1099, four per set, every other set vaulted
+PARTS = [(1000 + i, f"Set{i // 4}", "Systems") for i in range(100)]
+UNVAULTED = [part_id for part_id, warframe_set, _ in PARTS if int(warframe_set[3:]) % 2 == 0]
+
+
+@pytest.fixture
+def db_setup(monkeypatch):
+    def setup(conn):
+        conn.execute("CREATE TABLE prime_parts (id INTEGER PRIMARY KEY, warframe_set TEXT, parts_name TEXT)")
+        conn.execute("CREATE TABLE vault_status (id INTEGER PRIMARY KEY, warframe_set TEXT, vaulted TEXT, set_type TEXT)")
+        conn.executemany("INSERT INTO prime_parts (id, warframe_set, parts_name) VALUES (?, ?, ?)", PARTS)
+        conn.executemany(
+            "INSERT INTO vault_status (warframe_set, vaulted, set_type) VALUES (?, ?, ?)",
+            [(f"Set{i}", str(i % 2), "Warframe") for i in range(25)],
+        )
+        conn.commit()
+        update_item_id_map()
+        reset_maps(monkeypatch)
+
+    return setup
+
+
+def reset_maps(monkeypatch):
+    monkeypatch.setattr(id_map, "_MAPS", {})
+    monkeypatch.setattr(id_map, "_LATEST", {"data_version": None, "version": None})
+
+
+def encode(ids):
+    return client.post("/encode", json={"data": ids}).json()["data"]
+
+
+def decode(data):
+    return client.post("/decode", json={"data": data})
+
+
+class TestDenseIdCodec:
+    def test_encode_uses_dense_ids_when_shorter(self, db_path):
+        encoded = encode(UNVAULTED)
+
+        # The 52 unvaulted parts are dense IDs 0-51, a single run
+        assert encoded == "M1.RADM"
+        assert decode(encoded).json()["data"] == UNVAULTED
+
+    def test_old_links_decode_after_a_new_version(self, db_path, monkeypatch):
+        old_link = encode(UNVAULTED)
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE vault_status SET vaulted = '0'")
+        conn.commit()
+        conn.close()
+        update_item_id_map()
+        reset_maps(monkeypatch)
+
+        assert encode(UNVAULTED).startswith("M2.")
+        assert decode(old_link).json()["data"] == UNVAULTED
+
+    def test_unknown_parts_keep_raw_encoding(self, db_path):
+        assert encode([1, 2, 3]) == "BDg"
+
+    def test_unknown_version_is_invalid(self, db_path):
+        assert decode("M9.BAQ").status_code == 400
+        assert decode("M1").status_code == 400
+
+    def test_out_of_range_dense_ids_are_invalid(self, db_path):
+        for ids in ([-1], [1, -3], [99999999999999999999999]):
+            assert decode("M1." + encode_list(ids)).status_code == 400
+
+    def test_to_parts_drops_ids_outside_the_version(self):
+        id_map = ItemIdMap.from_part_ids(1, [10, 20, 30])
+
+        assert id_map.to_parts([-1, 0, 2, 3, -3]).tolist() == [10, 30]
@@ -0,0 +1,50 @@
+import importlib
+import json
+import sys
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from backend.helper import json_response
+
+payload = {
+    "relic_score": {"Lith A1": {"score": 0.1 + 0.2, "item_list": ["Ash Prime Systems"]}},
+    "drop_rate": Decimal("0.1111"),
+    "ids": np.array([1, 2], dtype=np.int32),
+    "count": np.int64(3),
+    "name": "Réplica",
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def module(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setitem(sys.modules, "orjson", None)
+    yield importlib.reload(json_response)
+    monkeypatch.undo()
+    importlib.reload(json_response)
+
+
+def test_dumps_matches_stdlib_values(module):
+    assert json.loads(module.dumps(payload)) == {
+        "relic_score": {"Lith A1": {"score": 0.30000000000000004, "item_list": ["Ash Prime Systems"]}},
+        "drop_rate": 0.1111,
+        "ids": [1, 2],
+        "count": 3,
+        "name": "Réplica",
+    }
+
+
+def test_dumps_rejects_unknown_types(module):
+    with pytest.raises(TypeError):
+        module.dumps({"x": object()})
+
+
+def test_render_counts_serialize_time(module):
+    holder = module.start_serialize_timing()
+
+    response = module.FastJSONResponse({"a": [1.5, 2]})
+
+    assert response.body == b'{"a":[1.5,2]}'
+    assert holder[0] > 0
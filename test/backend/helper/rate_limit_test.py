@@ -0,0 +1,40 @@
+from backend.helper.rate_limit import TokenBucketLimiter
+
+
+class TestTokenBucketLimiter:
+    def test_allows_burst_then_limits(self, clock):
+        limiter = TokenBucketLimiter.per_minute(3, burst=3, clock=clock)
+
+        assert [limiter.hit("a")[0] for _ in range(3)] == [True, True, True]
+        assert limiter.hit("a") == (False, 20)
+        # Other clients have their own bucket
+        assert limiter.hit("b") == (True, 0)
+
+    def test_refills_over_time(self, clock):
+        limiter = TokenBucketLimiter.per_minute(60, burst=1, clock=clock)
+
+        assert limiter.hit("a")[0]
+        assert not limiter.hit("a")[0]
+        clock.now = 1.0
+        assert limiter.hit("a")[0]
+
+    def test_sweeps_idle_clients(self, clock):
+        limiter = TokenBucketLimiter.per_minute(60, burst=60, sweep_interval=10, clock=clock)
+        limiter.hit("idle")
+        clock.now = 55.0
+        limiter.hit("active")
+
+        clock.now = 65.0
+        limiter.hit("new")
+
+        assert len(limiter) == 2
+        assert "idle" not in limiter._buckets
+
+    def test_caps_tracked_clients(self, clock):
+        limiter = TokenBucketLimiter.per_minute(90, max_clients=100, clock=clock)
+
+        for i in range(1000):
+            limiter.hit(f"10.0.{i // 256}.{i % 256}")
+
+        assert len(limiter) == 100
+        assert "10.0.3.231" in limiter._buckets
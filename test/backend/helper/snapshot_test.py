@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from backend.helper.snapshot import Snapshot, load_or_build, read_snapshot, write_snapshot
+
+
+@pytest.fixture
+def snapshot():
+    return Snapshot(
+        arrays={
+            "ids": np.arange(5, dtype=np.int32),
+            "rates": np.array([[0.25, 0.5], [1.0, 0.0]]),
+            "empty": np.zeros(0, dtype=np.uint8),
+        },
+        blobs={"body": b'{"a":1}', "none": b""},
+        meta={"names": ["Relic1", "Réplica"]},
+    )
+
+
+class TestSnapshot:
+    def test_round_trip_maps_arrays_read_only(self, tmp_path, snapshot):
+        path = str(tmp_path / "graph-1.snap")
+        write_snapshot(path, snapshot)
+
+        loaded = read_snapshot(path)
+
+        for name, arr in snapshot.arrays.items():
+            assert loaded.arrays[name].dtype == arr.dtype
+            np.testing.assert_array_equal(loaded.arrays[name], arr)
+        assert not loaded.arrays["ids"].flags.writeable
+        assert loaded.arrays["ids"].ctypes.data % 64 == 0
+        assert loaded.blobs == snapshot.blobs
+        assert loaded.meta == snapshot.meta
+
+    def test_load_or_build_builds_once_per_version(self, tmp_path, snapshot):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return snapshot
+
+        first = load_or_build("graph", 1, build, str(tmp_path))
+        second = load_or_build("graph", 1, build, str(tmp_path))
+        load_or_build("graph", 2, build, str(tmp_path))
+
+        assert len(builds) == 2
+        assert first.meta == second.meta
+        assert sorted(os.listdir(tmp_path)) == ["graph-2.snap", "graph.lock"]
+
+    def test_snapshot_past_max_age_is_rebuilt(self, tmp_path, snapshot):
+        load_or_build("status", 1, lambda: Snapshot(meta={"old": True}), str(tmp_path))
+        assert load_or_build("status", 1, lambda: snapshot, str(tmp_path), max_age=300).meta == {"old": True}
+
+        path = str(tmp_path / "status-1.snap")
+        os.utime(path, (os.path.getmtime(path) - 300,) * 2)
+        loaded = load_or_build("status", 1, lambda: snapshot, str(tmp_path), max_age=300)
+
+        assert loaded.meta == snapshot.meta
+        assert read_snapshot(path).meta == snapshot.meta
+
+    def test_load_or_build_without_directory_builds_in_process(self, snapshot):
+        assert load_or_build("graph", 1, lambda: snapshot, None) is snapshot
+
+    def test_unreadable_snapshot_is_rebuilt(self, tmp_path, snapshot):
+        (tmp_path / "graph-1.snap").write_bytes(b"garbage")
+
+        loaded = load_or_build("graph", 1, lambda: snapshot, str(tmp_path))
+
+        assert loaded.meta == snapshot.meta
+
+    def test_snapshot_of_another_format_is_rebuilt(self, tmp_path, snapshot, monkeypatch):
+        # A file left on the volume by a deploy with another snapshot layout
+        monkeypatch.setattr("backend.helper.snapshot.SNAPSHOT_FORMAT", 1)
+        write_snapshot(str(tmp_path / "graph-1.snap"), Snapshot(meta={"old": True}))
+        monkeypatch.undo()
+
+        with pytest.raises(ValueError, match="format 1"):
+            read_snapshot(str(tmp_path / "graph-1.snap"))
+        loaded = load_or_build("graph", 1, lambda: snapshot, str(tmp_path))
+
+        assert loaded.meta == snapshot.meta
+        assert read_snapshot(str(tmp_path / "graph-1.snap")).meta == snapshot.meta
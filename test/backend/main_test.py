@@ -0,0 +1,46 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.helper.rate_limit import TokenBucketLimiter
+from backend.main import RateLimiterMiddleware, TimingMiddleware, app
+
+
+def make_app(limiter: TokenBucketLimiter) -> FastAPI:
+    limited = FastAPI()
+
+    @limited.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    limited.add_middleware(TimingMiddleware)
+    limited.add_middleware(RateLimiterMiddleware, limiter=limiter)
+    return limited
+
+
+class TestMiddleware:
+    def test_rate_limiter_rejects_over_limit(self):
+        client = TestClient(make_app(TokenBucketLimiter.per_minute(2, burst=2)))
+
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 200
+        response = client.get("/ping")
+
+        assert response.status_code == 429
+        assert response.json()["detail"] == "Rate limit exceeded. Max 2 requests per 60 seconds."
+        assert response.headers["retry-after"] == "30"
+
+    def test_rate_limiter_keys_on_forwarded_for(self):
+        client = TestClient(make_app(TokenBucketLimiter.per_minute(1, burst=1)))
+
+        assert client.get("/ping", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 200
+        assert client.get("/ping", headers={"X-Forwarded-For": "2.2.2.2, 10.0.0.1"}).status_code == 200
+        assert client.get("/ping", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 429
+
+    def test_timing_header(self):
+        response = TestClient(app).post("/encode", json={"data": [1, 2, 3]})
+
+        assert response.status_code == 200
+        app_timing, serialize_timing = response.headers["server-timing"].split(", ")
+        assert app_timing.startswith("app;dur=")
+        assert serialize_timing.startswith("serialize;dur=")
+        assert float(serialize_timing.split("=")[1]) <= float(app_timing.split("=")[1])
@@ -1,6 +1,12 @@
+import os
+import re
+
+import pytest
 from fastapi.testclient import TestClient
 
+from backend.helper.encoded_response import pick_encoding
 from backend.main import app
+from backend.prime import status
 
 client = TestClient(app)
 
@@ -74,3 +80,125 @@ class TestPrimeStatusAPI:
             response.json()["detail"]
             == "Server error while fetching Prime status data."
         )
+
+
+class TestPrimeStatusEncodedCache:
+    prime_status_url = "/prime/status"
+
+    mock_joined_rows = [
+        ("Set1", "0", "Warframe", 1, "PartA"),
+        ("Set1", "0", "Warframe", 2, "PartB"),
+        ("Set2", "1", "Weapon", 3, "PartC"),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def reset_cache(self, monkeypatch):
+        monkeypatch.setitem(status._CACHE, "body", None)
+        monkeypatch.setitem(status._CACHE, "last_update", None)
+        monkeypatch.setattr("backend.prime.status.get_data_version", lambda: 1700000000)
+        self.queries = 0
+
+        def get_joined_rows():
+            self.queries += 1
+            return self.mock_joined_rows
+
+        monkeypatch.setattr(
+            status.PrimeStatusService, "get_joined_rows", staticmethod(get_joined_rows)
+        )
+
+    def test_serializes_once_and_sets_strong_etag(self):
+        first = client.get(self.prime_status_url, headers={"Accept-Encoding": "identity"})
+        second = client.get(self.prime_status_url, headers={"Accept-Encoding": "identity"})
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert first.json()[0] == {
+            "warframe_set": "Set1",
+            "status": "0",
+            "type": "Warframe",
+            "parts": [{"parts": "PartA", "id": 1}, {"parts": "PartB", "id": 2}],
+        }
+        assert re.fullmatch(r'"prime-status-1700000000-[0-9a-f]{16}"', first.headers["etag"])
+        assert "content-encoding" not in first.headers
+        assert self.queries == 1
+
+    def test_gzip_variant(self):
+        response = client.get(self.prime_status_url, headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert re.fullmatch(r'"prime-status-1700000000-[0-9a-f]{16}-gzip"', response.headers["etag"])
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert len(response.json()) == 2
+
+    def test_zstd_variant(self):
+        pytest.importorskip("zstandard")
+        response = client.get(self.prime_status_url, headers={"Accept-Encoding": "zstd, gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "zstd"
+        assert re.fullmatch(r'"prime-status-1700000000-[0-9a-f]{16}-zstd"', response.headers["etag"])
+        assert len(response.json()) == 2
+
+    def test_if_none_match_returns_304(self):
+        etag = client.get(self.prime_status_url).headers["etag"]
+
+        response = client.get(self.prime_status_url, headers={"If-None-Match": f"W/{etag}"})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert self.queries == 1
+
+    def test_new_last_update_changes_etag(self, monkeypatch):
+        etag = client.get(self.prime_status_url).headers["etag"]
+        monkeypatch.setattr("backend.prime.status.get_data_version", lambda: 1700000001)
+
+        response = client.get(self.prime_status_url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert self.queries == 2
+
+    def test_ttl_rebuild_with_other_bytes_changes_etag(self, monkeypatch):
+        etag = client.get(self.prime_status_url).headers["etag"]
+        monkeypatch.setattr(self, "mock_joined_rows", [("Set1", "1", "Warframe", 1, "PartA")])
+        monkeypatch.setitem(status._CACHE, "ts", 0.0)
+
+        response = client.get(self.prime_status_url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.headers["etag"].startswith('"prime-status-1700000000-')
+
+    def test_ttl_rebuilds_shared_snapshot(self, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.helper.snapshot.SNAPSHOT_DIR", str(tmp_path))
+        client.get(self.prime_status_url)
+        # vault_status edited without a new last_update, then the TTL runs out
+        monkeypatch.setattr(self, "mock_joined_rows", [("Set1", "1", "Warframe", 1, "PartA")])
+        path = str(tmp_path / "prime_status-1700000000.snap")
+        aged = os.path.getmtime(path) - status._CACHE_TTL_SECONDS
+        os.utime(path, (aged, aged))
+        monkeypatch.setitem(status._CACHE, "ts", 0.0)
+
+        response = client.get(self.prime_status_url)
+
+        assert response.json() == [
+            {"warframe_set": "Set1", "status": "1", "type": "Warframe", "parts": [{"parts": "PartA", "id": 1}]}
+        ]
+        assert self.queries == 2
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, "identity"),
+        ("gzip, deflate, br", "gzip"),
+        ("gzip;q=0, identity", "identity"),
+        ("*", "zstd"),
+        ("zstd;q=0, gzip", "gzip"),
+    ],
+)
+def test_pick_encoding(accept_encoding, expected):
+    available = {"identity": b"", "gzip": b"", "zstd": b""}
+    assert pick_encoding(accept_encoding, available) == expected
@@ -0,0 +1,47 @@
+import sqlite3
+from typing import Callable
+
+import pytest
+
+from database.clients.sqlite_client import SqliteClient
+
+
+class FakeClock:
+    """Stand-in for ``time.monotonic``, returns ``now`` until a test moves it."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def db_setup() -> Callable[[sqlite3.Connection], None]:
+    """Fills the ``db_path`` database; modules override it with the tables they need."""
+    return lambda conn: None
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch, db_setup):
+    """
+    A SQLite file in ``tmp_path`` set up by ``db_setup`` and pointed to by DB_PATH.
+
+    The connections the pool opened on it are closed after the test.
+    """
+    path = str(tmp_path / "warframe.db")
+    monkeypatch.delenv("DB_NAME", raising=False)
+    monkeypatch.setenv("DB_PATH", path)
+    conn = sqlite3.connect(path)
+    try:
+        db_setup(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    yield path
+    SqliteClient(path).close()
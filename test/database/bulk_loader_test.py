@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+from database.bulk_loader import BulkLoader
+
+
+def count_rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestBulkLoader:
+    def test_inserts_rows_from_a_generator_in_chunks(self, db_path):
+        rows = ((f"Prize{i}", i / 100) for i in range(12345))
+
+        with BulkLoader(db_path, chunk_size=1000) as loader, loader.transaction():
+            loader.create_table("rewards", ["prize TEXT", "drop_rate REAL"])
+            inserted = loader.insert_rows("rewards", ["prize", "drop_rate"], rows)
+
+        assert inserted == 12345
+        assert count_rows(db_path, "rewards") == 12345
+
+    def test_uses_load_pragmas_on_one_connection(self, db_path):
+        with BulkLoader(db_path) as loader:
+            conn = loader.conn
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+            with loader.transaction():
+                loader.create_table("rewards", ["prize TEXT"])
+            with loader.transaction():
+                loader.insert_rows("rewards", ["prize"], [("Forma",)])
+            assert loader.conn is conn
+
+    def test_rolls_back_a_failed_section(self, db_path):
+        with BulkLoader(db_path) as loader:
+            with loader.transaction():
+                loader.create_table("rewards", ["prize TEXT"])
+                loader.insert_rows("rewards", ["prize"], [("Forma",)])
+
+            def rows():
+                yield ("Orokin Cell",)
+                raise ValueError("parse error")
+
+            with pytest.raises(ValueError):
+                with loader.transaction():
+                    loader.drop_table("rewards")
+                    loader.create_table("rewards", ["prize TEXT"])
+                    loader.insert_rows("rewards", ["prize"], rows())
+
+        assert count_rows(db_path, "rewards") == 1
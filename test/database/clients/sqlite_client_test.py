@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from database.clients.sqlite_client import SqliteClient
+
+
+@pytest.fixture
+def db_setup():
+    def setup(conn):
+        conn.execute("CREATE TABLE last_update (time INTEGER NOT NULL)")
+        conn.execute("INSERT INTO last_update VALUES (42)")
+
+    return setup
+
+
+class TestSqliteClient:
+    def test_select_reuses_connection_within_thread(self, db_path):
+        first = SqliteClient(db_path)
+        assert first.select("SELECT time FROM last_update") == [(42,)]
+        assert SqliteClient(db_path).conn is first.conn
+
+    def test_select_uses_one_connection_per_thread(self, db_path):
+        main_conn = SqliteClient(db_path).conn
+        other = []
+        thread = threading.Thread(target=lambda: other.append(SqliteClient(db_path).conn))
+        thread.start()
+        thread.join()
+        assert other[0] is not main_conn
+
+    def test_warms_file_once_per_process(self, db_path, monkeypatch):
+        reads = []
+        monkeypatch.setattr("database.clients.sqlite_client._read_through", reads.append)
+        SqliteClient(db_path).conn
+        thread = threading.Thread(target=lambda: SqliteClient(db_path).conn)
+        thread.start()
+        thread.join()
+        assert reads == [db_path]
+
+    def test_select_with_params(self, db_path):
+        client = SqliteClient(db_path)
+        assert client.select("SELECT time FROM last_update WHERE time = ?", [42]) == [(42,)]
+        assert client.select("SELECT time FROM last_update WHERE time = ?", [1]) == []
+
+    def test_connection_is_read_only(self, db_path):
+        with pytest.raises(sqlite3.OperationalError):
+            SqliteClient(db_path).select("UPDATE last_update SET time = 1")
+        assert SqliteClient(db_path).select("SELECT time FROM last_update") == [(42,)]
+
+    def test_sees_writes_from_other_connections(self, db_path):
+        client = SqliteClient(db_path)
+        assert client.select("SELECT time FROM last_update") == [(42,)]
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE last_update SET time = 43")
+        conn.commit()
+        conn.close()
+        assert client.select("SELECT time FROM last_update") == [(43,)]
+
+    def test_missing_database_raises(self, tmp_path):
+        with pytest.raises(sqlite3.OperationalError):
+            SqliteClient(str(tmp_path / "missing.db")).select("SELECT 1")
+
+    def test_reopens_after_file_is_swapped(self, db_path):
+        client = SqliteClient(db_path)
+        old_conn = client.conn
+        staging = db_path + ".staging"
+        conn = sqlite3.connect(staging)
+        conn.execute("CREATE TABLE last_update (time INTEGER NOT NULL)")
+        conn.execute("INSERT INTO last_update VALUES (44)")
+        conn.commit()
+        conn.close()
+        os.replace(staging, db_path)
+
+        assert client.select("SELECT time FROM last_update") == [(44,)]
+        assert client.conn is not old_conn
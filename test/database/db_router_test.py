@@ -0,0 +1,39 @@
+import pytest
+
+from database import db_router
+
+
+@pytest.fixture
+def db_setup():
+    def setup(conn):
+        conn.execute("CREATE TABLE relic_rewards (id INTEGER PRIMARY KEY, prize TEXT NOT NULL)")
+        conn.executemany(
+            "INSERT INTO relic_rewards (prize) VALUES (?)", [(f"Prize {i}",) for i in range(100)]
+        )
+
+    return setup
+
+
+class TestSelectIn:
+    query = "SELECT id FROM relic_rewards WHERE prize IN ({keys}) ORDER BY id"
+
+    def test_select_in_returns_matching_rows(self, db_path):
+        keys = ["Prize 3", "Prize 1", "Missing", "Prize 3"]
+        assert db_router.select_in(self.query, keys) == [(2,), (4,)]
+
+    def test_select_in_handles_empty_keys(self, db_path):
+        assert db_router.select_in(self.query, []) == []
+
+    def test_select_in_sends_same_sql_for_any_key_count(self, db_path, monkeypatch):
+        sent = []
+        real_select = db_router.select
+
+        def spy_select(query, params=None):
+            sent.append(query)
+            return real_select(query, params)
+
+        monkeypatch.setattr(db_router, "select", spy_select)
+        for size in [1, 7, 100]:
+            rows = db_router.select_in(self.query, [f"Prize {i}" for i in range(size)])
+            assert len(rows) == size
+        assert len(set(sent)) == 1
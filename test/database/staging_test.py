@@ -0,0 +1,76 @@
+import os
+import sqlite3
+
+import pytest
+
+from database.clients.sqlite_client import SqliteClient
+from database.staging import StagingDatabase
+
+REQUIRED = ["relic_rewards", "last_update"]
+
+
+@pytest.fixture
+def db_setup():
+    def setup(conn):
+        conn.execute("CREATE TABLE last_update (time INTEGER NOT NULL)")
+        conn.execute("INSERT INTO last_update VALUES (1)")
+        conn.execute("CREATE TABLE relic_rewards (relic TEXT)")
+        conn.execute("INSERT INTO relic_rewards VALUES ('Axi A1 Relic')")
+        conn.execute("CREATE TABLE prime_parts (id INTEGER PRIMARY KEY)")
+        conn.execute("INSERT INTO prime_parts VALUES (7)")
+
+    return setup
+
+
+def write(path, *queries):
+    conn = sqlite3.connect(path)
+    for query in queries:
+        conn.execute(query)
+    conn.commit()
+    conn.close()
+
+
+class TestStagingDatabase:
+    def test_readers_see_old_file_until_swap(self, db_path):
+        reader = SqliteClient(db_path)
+        with StagingDatabase(db_path, REQUIRED) as staging:
+            write(
+                staging.path,
+                "DELETE FROM relic_rewards",
+                "INSERT INTO relic_rewards VALUES ('Lith B2 Relic')",
+                "UPDATE last_update SET time = 2",
+            )
+            assert reader.select("SELECT relic FROM relic_rewards") == [("Axi A1 Relic",)]
+
+        assert reader.select("SELECT relic FROM relic_rewards") == [("Lith B2 Relic",)]
+        assert reader.select("SELECT time FROM last_update") == [(2,)]
+        # Tables the ingest does not touch are carried over
+        assert reader.select("SELECT id FROM prime_parts") == [(7,)]
+        # ANALYZE ran before the swap
+        assert reader.select("SELECT COUNT(*) FROM sqlite_stat1")[0][0] > 0
+        assert not os.path.exists(staging.path)
+
+    def test_failed_ingest_keeps_live_file(self, db_path):
+        with pytest.raises(RuntimeError):
+            with StagingDatabase(db_path, REQUIRED) as staging:
+                write(staging.path, "DELETE FROM relic_rewards")
+                raise RuntimeError("parse failed")
+
+        assert SqliteClient(db_path).select("SELECT relic FROM relic_rewards") == [("Axi A1 Relic",)]
+        assert not os.path.exists(staging.path)
+
+    def test_empty_required_table_is_not_swapped_in(self, db_path):
+        with pytest.raises(ValueError, match="empty relic_rewards"):
+            with StagingDatabase(db_path, REQUIRED) as staging:
+                write(staging.path, "DELETE FROM relic_rewards")
+
+        assert SqliteClient(db_path).select("SELECT relic FROM relic_rewards") == [("Axi A1 Relic",)]
+        assert not os.path.exists(staging.path)
+
+    def test_builds_from_scratch_without_live_file(self, tmp_path):
+        path = str(tmp_path / "new.db")
+        with StagingDatabase(path, ["last_update"]) as staging:
+            write(staging.path, "CREATE TABLE last_update (time INTEGER)", "INSERT INTO last_update VALUES (3)")
+
+        assert SqliteClient(path).select("SELECT time FROM last_update") == [(3,)]
+        SqliteClient(path).close()
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from database.utils.id_map import load_item_id_map, load_latest_item_id_map, update_item_id_map
+
+
+@pytest.fixture
+def db_setup():
+    def setup(conn):
+        conn.execute("CREATE TABLE prime_parts (id INTEGER PRIMARY KEY, warframe_set TEXT, parts_name TEXT)")
+        conn.execute("CREATE TABLE vault_status (id INTEGER PRIMARY KEY, warframe_set TEXT, vaulted TEXT, set_type TEXT)")
+        conn.executemany(
+            "INSERT INTO prime_parts (id, warframe_set, parts_name) VALUES (?, ?, ?)",
+            [(1, "Ash", "Systems"), (2, "Ash", "Chassis"), (5, "Banshee", "Systems"), (9, "Chroma", "Systems")],
+        )
+        conn.executemany(
+            "INSERT INTO vault_status (warframe_set, vaulted, set_type) VALUES (?, ?, ?)",
+            [("Ash", "1", "Warframe"), ("Banshee", "0", "Warframe"), ("Chroma", "0", "Warframe")],
+        )
+
+    return setup
+
+
+def set_vaulted(path, warframe_set, vaulted):
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE vault_status SET vaulted = ? WHERE warframe_set = ?", [vaulted, warframe_set])
+    conn.commit()
+    conn.close()
+
+
+class TestItemIdMap:
+    def test_numbers_unvaulted_parts_first(self, db_path):
+        update_item_id_map()
+
+        assert load_latest_item_id_map() == (1, [5, 9, 1, 2])
+
+    def test_keeps_version_while_numbering_is_unchanged(self, db_path):
+        update_item_id_map()
+        update_item_id_map()
+
+        assert load_latest_item_id_map()[0] == 1
+
+    def test_adds_version_and_keeps_old_one(self, db_path):
+        update_item_id_map()
+        set_vaulted(db_path, "Ash", "0")
+        set_vaulted(db_path, "Chroma", "1")
+        update_item_id_map()
+
+        assert load_latest_item_id_map() == (2, [1, 2, 5, 9])
+        assert load_item_id_map(1) == [5, 9, 1, 2]
@@ -0,0 +1,80 @@
+import os
+import sqlite3
+
+import pytest
+
+from database.clients.sqlite_client import SqliteClient
+from database.utils import version
+from database.utils.version import DataVersionWatcher
+
+
+@pytest.fixture
+def db_setup():
+    def setup(conn):
+        conn.execute("CREATE TABLE last_update (time INTEGER NOT NULL)")
+        conn.execute("INSERT INTO last_update VALUES (42)")
+
+    return setup
+
+
+def set_last_update(path, value):
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE last_update SET time = ?", [value])
+    conn.commit()
+    conn.close()
+
+
+class TestDataVersionWatcher:
+    @pytest.fixture(autouse=True)
+    def count_queries(self, monkeypatch):
+        self.queries = 0
+        get_last_update = version.get_last_update
+
+        def counted():
+            self.queries += 1
+            return get_last_update()
+
+        monkeypatch.setattr("database.utils.version.get_last_update", counted)
+
+    def test_reads_last_update_once_while_file_unchanged(self, db_path, clock):
+        watcher = DataVersionWatcher(db_path, interval=1.0, clock=clock)
+
+        assert watcher.get() == 42
+        clock.now = 5.0
+        assert watcher.get() == 42
+        assert self.queries == 1
+
+    def test_rereads_after_file_changes(self, db_path, clock):
+        watcher = DataVersionWatcher(db_path, interval=1.0, clock=clock)
+        assert watcher.get() == 42
+
+        set_last_update(db_path, 43)
+        # Within the interval the files are not even looked at
+        assert watcher.get() == 42
+        clock.now = 1.0
+        assert watcher.get() == 43
+        assert self.queries == 2
+
+    def test_detects_swapped_file(self, db_path, tmp_path):
+        watcher = DataVersionWatcher(db_path, interval=0)
+        assert watcher.get() == 42
+
+        staging = str(tmp_path / "staging.db")
+        conn = sqlite3.connect(staging)
+        conn.execute("CREATE TABLE last_update (time INTEGER NOT NULL)")
+        conn.execute("INSERT INTO last_update VALUES (44)")
+        conn.commit()
+        conn.close()
+        os.replace(staging, db_path)
+        SqliteClient(db_path).close()
+
+        assert watcher.get() == 44
+
+    def test_missing_database_defaults_to_zero(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "missing.db")
+        monkeypatch.setenv("DB_PATH", path)
+        watcher = DataVersionWatcher(path, interval=0)
+
+        assert watcher.get() == 0
+        assert watcher.get() == 0
+        assert self.queries == 1
@@ -0,0 +1,101 @@
+"""
+Parse time and peak memory of the drop table page, streaming parser against
+the whole-document BeautifulSoup tree it replaced.
+
+Each parser runs in a fresh interpreter, so the peak RSS of one does not hide
+the other. Reads the page saved by the last download (DROP_TABLE_CACHE) when
+present, else a page synthesized from the test fixture, or the page given as
+argument. Not collected by pytest, run it directly:
+
+    python -m test.parser.drop_table.benchmark_parser [page.html]
+"""
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from parser.drop_table.utils.download import DROP_TABLE_CACHE
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "drop_table.html")
+SYNTHETIC_BYTES = 6 * 1024 * 1024
+
+
+def synthesize_page(path: str, size: int = SYNTHETIC_BYTES) -> None:
+    """The fixture page with the rows of every table repeated to about ``size`` bytes."""
+    with open(FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+    repeat = max(1, size // len(html))
+    html = re.sub(
+        r"(<table>)(.*?)(</table>)",
+        lambda m: m.group(1) + m.group(2) * repeat + m.group(3),
+        html,
+        flags=re.S,
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def parse_beautifulsoup(path: str) -> int:
+    from bs4 import BeautifulSoup
+
+    with open(path, "rb") as f:
+        body = BeautifulSoup(f, "html.parser").find("body")
+    rows = 0
+    # What the updaters did: walk every table of the tree, the tree alive throughout
+    for title, table in zip(body.find_all("h3")[2:], body.find_all("table")):
+        for tr in table.find_all("tr"):
+            [cell.get_text().strip() for cell in tr.find_all(["th", "td"])]
+            rows += 1
+    return rows
+
+
+def parse_stream(path: str) -> int:
+    from parser.drop_table.utils.stream_parser import DropTablePage
+
+    page = DropTablePage(path)
+    page.read_date()
+    # UpdateDropDB hashes each section as it is read and keeps no rows, then streams
+    # the page again for the changed tables only
+    return sum(len(section.rows) for section in page.sections())
+
+
+PARSERS = {"BeautifulSoup": parse_beautifulsoup, "stream": parse_stream}
+
+
+def child(name: str, path: str) -> None:
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    rows = PARSERS[name](path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(rows, elapsed, peak - before)
+
+
+def main(path: str) -> None:
+    print(f"{path}: {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+    for name in PARSERS:
+        output = subprocess.run(
+            [sys.executable, "-m", __spec__.name, "--child", name, path],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        rows, elapsed, rss_kib = int(output[0]), float(output[1]), int(output[2])
+        print(f"{name:>14}: {elapsed:6.2f}s, peak RSS +{rss_kib / 1024:6.1f} MiB, {rows} rows")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) > 1:
+        main(sys.argv[1])
+    elif os.path.exists(DROP_TABLE_CACHE):
+        main(DROP_TABLE_CACHE)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            page = os.path.join(directory, "drop_table.html")
+            synthesize_page(page)
+            main(page)
@@ -0,0 +1,160 @@
+import logging
+import os
+import sqlite3
+
+import pytest
+
+from parser.drop_table import updateDropDB
+from parser.drop_table.updateDropDB import UpdateDropDB
+from parser.drop_table.updater.relic import UpdateRelicReward
+from parser.drop_table.utils.stream_parser import DropTablePage
+
+PAGE = os.path.join(os.path.dirname(__file__), "fixtures", "drop_table.html")
+
+
+@pytest.fixture
+def db_setup():
+    def setup(conn):
+        conn.execute("CREATE TABLE prime_parts (id INTEGER PRIMARY KEY, warframe_set TEXT, parts_name TEXT)")
+        conn.execute("CREATE TABLE vault_status (id INTEGER PRIMARY KEY, warframe_set TEXT, vaulted TEXT, set_type TEXT)")
+        conn.execute("CREATE TABLE last_update (time INTEGER NOT NULL)")
+        conn.execute("INSERT INTO prime_parts (warframe_set, parts_name) VALUES ('Ash', 'Systems')")
+        conn.execute("INSERT INTO vault_status (warframe_set, vaulted) VALUES ('Ash', '0')")
+        conn.execute("INSERT INTO last_update VALUES (0)")
+
+    return setup
+
+
+def write_page(path, relic_rate="2.00%"):
+    with open(PAGE, encoding="utf-8") as f:
+        html = f.read().replace("Rare (2.00%)", f"Rare ({relic_rate})")
+    path.write_text(html, encoding="utf-8")
+    return str(path)
+
+
+def run_update(tmp_path, web_update_time, relic_rate="2.00%", force=False):
+    updater = UpdateDropDB.__new__(UpdateDropDB)
+    updater.force = force
+    updater.page = DropTablePage(write_page(tmp_path / "drop_table.html", relic_rate))
+    updater.web_update_time = web_update_time
+    updater.update()
+
+
+def select(path, query):
+    conn = sqlite3.connect(path)
+    rows = conn.execute(query).fetchall()
+    conn.close()
+    return rows
+
+
+class TestUpdateDropDB:
+    def test_loads_every_section_and_stores_hashes(self, db_path, tmp_path):
+        run_update(tmp_path, 1)
+
+        assert select(db_path, "SELECT radiant, prize, drop_rate FROM relic_rewards ORDER BY id") == [
+            ("Intact", "Ash Prime Systems Blueprint", 2),
+            ("Radiant", "Forma   Blueprint", 20),
+        ]
+        assert select(db_path, "SELECT source, item FROM mod_drops_by_source") == [("Arid Eviscerator", "Primed Fury")]
+        assert select(db_path, "SELECT item, source, rarity FROM mod_drops_by_mod") == [("Fire & Ice", "Frost Eximus", "Rare")]
+        # Both bounty sections end up in bounty_rewards
+        assert select(db_path, "SELECT source FROM bounty_rewards ORDER BY id") == [
+            ("Level 5 - 15 Cetus Bounty",),
+            ("Level 65 - 70 Hex Bounty",),
+        ]
+        assert {row[0] for row in select(db_path, "SELECT table_name FROM section_hashes")} == {
+            "mission_rewards",
+            "relic_rewards",
+            "key_rewards",
+            "dynamic_location_rewards",
+            "bounty_rewards",
+            "sortie_rewards",
+            "mod_drops_by_source",
+            "mod_drops_by_mod",
+        }
+        assert select(db_path, "SELECT time FROM last_update") == [(1,)]
+
+    def test_rebuilds_only_changed_sections(self, db_path, tmp_path, caplog):
+        run_update(tmp_path, 1)
+        created = select(db_path, "SELECT created_at FROM mission_rewards")
+
+        with caplog.at_level(logging.INFO):
+            run_update(tmp_path, 2, relic_rate="3.00%")
+
+        assert "MainUpdate: relic_rewards changed (1 sections), rebuilding" in caplog.messages
+        assert "MainUpdate: mission_rewards unchanged (1 sections), skipping" in caplog.messages
+        assert "MainUpdate: bounty_rewards unchanged (2 sections), skipping" in caplog.messages
+        assert select(db_path, "SELECT drop_rate FROM relic_rewards ORDER BY id") == [(3,), (20,)]
+        assert select(db_path, "SELECT created_at FROM mission_rewards") == created
+        assert select(db_path, "SELECT time FROM last_update") == [(2,)]
+
+    def test_page_is_streamed_again_only_for_changed_tables(self, db_path, tmp_path, monkeypatch):
+        run_update(tmp_path, 1)
+        reads = []
+        sections = DropTablePage.sections
+
+        def counted_sections(page):
+            reads.append(1)
+            return sections(page)
+
+        monkeypatch.setattr(DropTablePage, "sections", counted_sections)
+        run_update(tmp_path, 2)
+        assert len(reads) == 1
+
+        run_update(tmp_path, 3, relic_rate="3.00%")
+        assert len(reads) == 3
+        assert select(db_path, "SELECT drop_rate FROM relic_rewards ORDER BY id") == [(3,), (20,)]
+
+    def test_force_rebuilds_everything(self, db_path, tmp_path, caplog):
+        run_update(tmp_path, 1)
+
+        with caplog.at_level(logging.INFO):
+            run_update(tmp_path, 2, force=True)
+
+        assert not [message for message in caplog.messages if "skipping" in message]
+
+    def test_new_index_rebuilds_unchanged_section(self, db_path, tmp_path, monkeypatch, caplog):
+        run_update(tmp_path, 1)
+        monkeypatch.setattr(
+            UpdateRelicReward, "get_table_indexes", lambda self: [["prize", "relic"], ["relic"], ["rarity"]]
+        )
+
+        with caplog.at_level(logging.INFO):
+            run_update(tmp_path, 2)
+
+        assert "MainUpdate: relic_rewards changed (1 sections), rebuilding" in caplog.messages
+        assert "MainUpdate: mission_rewards unchanged (1 sections), skipping" in caplog.messages
+        assert select(db_path, "SELECT name FROM sqlite_master WHERE name = 'ix_relic_rewards_rarity'")
+
+    def test_parses_cached_page_offline(self, db_path, tmp_path, monkeypatch):
+        cache_path = write_page(tmp_path / "drop_table.html")
+        monkeypatch.setattr(updateDropDB, "fetch_drop_table", pytest.fail)
+
+        UpdateDropDB(offline=True, cache_path=cache_path)
+
+        assert select(db_path, "SELECT drop_rate FROM relic_rewards ORDER BY id") == [(2,), (20,)]
+
+    def test_not_modified_page_is_not_parsed(self, db_path, tmp_path, monkeypatch):
+        monkeypatch.setattr(updateDropDB, "fetch_drop_table", lambda cache_path: False)
+
+        UpdateDropDB(cache_path=str(tmp_path / "missing.html"))
+
+        assert select(db_path, "SELECT time FROM last_update") == [(0,)]
+
+    def test_unreadable_page_is_downloaded_again(self, db_path, tmp_path, monkeypatch):
+        cache_path = str(tmp_path / "drop_table.html")
+        meta_path = cache_path + ".meta.json"
+
+        def fetch(cache_path):
+            with open(cache_path, "w", encoding="utf-8") as f:
+                f.write("<html><body>Not a date<h3>Missions:</h3></body></html>")
+            with open(meta_path, "w") as f:
+                f.write('{"etag": "\\"1\\""}')
+            return True
+
+        monkeypatch.setattr(updateDropDB, "fetch_drop_table", fetch)
+
+        with pytest.raises(ValueError):
+            UpdateDropDB(cache_path=cache_path)
+
+        assert not os.path.exists(meta_path)
@@ -0,0 +1,45 @@
+import sqlite3
+
+from database.bulk_loader import BulkLoader
+from parser.drop_table.updater import UpdateRelicReward
+from parser.drop_table.utils.stream_parser import parse_sections
+
+RELIC_TABLE = """
+<table>
+<tr><th colspan="2">Axi A1 Relic (Intact)</th></tr>
+<tr><td>Ash Prime Systems Blueprint</td><td>Rare (2.00%)</td></tr>
+<tr><td>Forma Blueprint</td><td>Uncommon (11.00%)</td></tr>
+<tr class="blank-row"><td class="blank-row" colspan="2"></td></tr>
+<tr><th colspan="2">Axi A1 Relic (Radiant)</th></tr>
+<tr><td>Ash Prime Systems Blueprint</td><td>Rare (10.00%)</td></tr>
+</table>
+"""
+
+
+def relic_table():
+    return next(parse_sections([RELIC_TABLE])).rows
+
+
+class TestBaseUpdater:
+    def test_run_update_streams_rows_into_the_table(self, db_path):
+        UpdateRelicReward(relic_table()).run_update()
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT relic, radiant, prize, rarity, drop_rate FROM relic_rewards ORDER BY id").fetchall()
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert rows == [
+            ("Axi A1 Relic", "Intact", "Ash Prime Systems Blueprint", "Rare", 2),
+            ("Axi A1 Relic", "Intact", "Forma Blueprint", "Uncommon", 11),
+            ("Axi A1 Relic", "Radiant", "Ash Prime Systems Blueprint", "Rare", 10),
+        ]
+        assert "ix_relic_rewards_relic" in indexes
+
+    def test_run_update_replaces_the_table_on_a_shared_loader(self, db_path):
+        with BulkLoader() as loader:
+            UpdateRelicReward(relic_table()).run_update(loader)
+            UpdateRelicReward(relic_table()).run_update(loader)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM relic_rewards").fetchone()[0] == 3
+        conn.close()
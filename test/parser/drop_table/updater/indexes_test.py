@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+from backend.drop.graph import PART_RELIC_QUERY, RELIC_SOURCE_QUERY
+from backend.prime.status import JOINED_ROWS_QUERY
+from database.bulk_loader import BulkLoader
+from database.db_router import IN_KEYS
+from database.utils.derived import update_derived_tables
+from database.utils.indexes import analyze, create_schema_indexes
+from parser.drop_table.updater import (
+    UpdateBountyReward,
+    UpdateDynamicLocationReward,
+    UpdateKeyReward,
+    UpdateMissionReward,
+    UpdateRelicReward,
+)
+
+UPDATERS = [
+    UpdateBountyReward,
+    UpdateDynamicLocationReward,
+    UpdateKeyReward,
+    UpdateMissionReward,
+    UpdateRelicReward,
+]
+
+
+@pytest.fixture
+def db_setup():
+    def setup(conn):
+        with BulkLoader() as loader:
+            for updater_cls in UPDATERS:
+                updater = updater_cls(None)
+                updater._create_table(loader)
+                updater._create_indexes(loader)
+
+        conn.execute("CREATE TABLE prime_parts (id INTEGER PRIMARY KEY, warframe_set TEXT, parts_name TEXT)")
+        conn.execute("CREATE TABLE vault_status (id INTEGER PRIMARY KEY, warframe_set TEXT, vaulted TEXT, set_type TEXT)")
+        conn.executemany(
+            "INSERT INTO relic_rewards (prize, radiant, rarity, drop_rate, relic) VALUES (?, ?, ?, ?, ?)",
+            [(f"Set{i} Prime Systems Blueprint", "Intact", "Rare", 2, f"Axi A{i} Relic") for i in range(200)],
+        )
+        conn.executemany(
+            "INSERT INTO mission_rewards (prize, rotation, rarity, drop_rate, source) VALUES (?, ?, ?, ?, ?)",
+            [(f"Axi A{i} Relic", "Rotation C", "Rare", 10, f"Node{i}") for i in range(200)],
+        )
+        conn.executemany(
+            "INSERT INTO prime_parts (warframe_set, parts_name) VALUES (?, ?)",
+            [(f"Set{i}", "Systems") for i in range(200)],
+        )
+        conn.executemany(
+            "INSERT INTO vault_status (warframe_set, vaulted, set_type) VALUES (?, ?, ?)",
+            [(f"Set{i}", "0", "Warframe") for i in range(200)],
+        )
+        conn.commit()
+        update_derived_tables()
+        create_schema_indexes()
+        analyze()
+
+    return setup
+
+
+def query_plan(path: str, query: str) -> str:
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", ["[]"] if "?" in query else []).fetchall()
+    finally:
+        conn.close()
+    return "\n".join(row[-1] for row in rows)
+
+
+class TestSearchIndexes:
+    def test_updaters_create_declared_indexes(self, db_path):
+        conn = sqlite3.connect(db_path)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert {
+            "ix_relic_rewards_prize_relic",
+            "ix_relic_rewards_relic",
+            "ix_mission_rewards_prize",
+            "ix_bounty_rewards_prize",
+            "ix_part_relic_best_prize",
+            "ix_relic_source_scores_relic",
+            "ix_prime_parts_warframe_set",
+            "ix_vault_status_warframe_set",
+        } <= indexes
+
+    def test_analyze_collects_statistics(self, db_path):
+        conn = sqlite3.connect(db_path)
+        tables = {row[0] for row in conn.execute("SELECT tbl FROM sqlite_stat1")}
+        conn.close()
+        assert {"relic_rewards", "part_relic_best", "relic_source_scores"} <= tables
+
+    def test_part_relic_lookup_uses_prize_index(self, db_path):
+        query = PART_RELIC_QUERY.replace("{table}", "part_relic_best").replace("{keys}", IN_KEYS)
+        assert "USING INDEX ix_part_relic_best_prize" in query_plan(db_path, query)
+
+    def test_relic_source_lookup_uses_relic_index(self, db_path):
+        query = RELIC_SOURCE_QUERY.replace("{table}", "relic_source_scores").replace("{keys}", IN_KEYS)
+        assert "USING INDEX ix_relic_source_scores_relic" in query_plan(db_path, query)
+
+    def test_prime_status_join_uses_warframe_set_index(self, db_path):
+        assert "USING INDEX ix_prime_parts_warframe_set" in query_plan(db_path, JOINED_ROWS_QUERY)
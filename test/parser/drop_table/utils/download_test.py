@@ -0,0 +1,91 @@
+import json
+
+import pytest
+import requests
+
+from parser.drop_table.utils.download import fetch_drop_table, forget_drop_table
+
+URL = "https://example.invalid/drop_table.html"
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache" / "drop_table.html")
+
+
+class TestFetchDropTable:
+    def test_downloads_and_stores_validators(self, cache_path):
+        session = FakeSession(FakeResponse(200, b"<html>v1</html>", {"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 00:00:00 GMT"}))
+
+        assert fetch_drop_table(URL, cache_path, session) is True
+
+        with open(cache_path, "rb") as f:
+            assert f.read() == b"<html>v1</html>"
+        assert session.requests == [{"Accept-Encoding": "gzip"}]
+        with open(cache_path + ".meta.json") as f:
+            assert json.load(f)["etag"] == '"v1"'
+
+    def test_sends_validators_and_keeps_cache_on_304(self, cache_path):
+        session = FakeSession(
+            FakeResponse(200, b"<html>v1</html>", {"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 00:00:00 GMT"}),
+            FakeResponse(304),
+        )
+        fetch_drop_table(URL, cache_path, session)
+
+        assert fetch_drop_table(URL, cache_path, session) is False
+
+        assert session.requests[1] == {
+            "Accept-Encoding": "gzip",
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Sat, 17 Oct 2026 00:00:00 GMT",
+        }
+        with open(cache_path, "rb") as f:
+            assert f.read() == b"<html>v1</html>"
+
+    def test_forgotten_validators_download_again(self, cache_path):
+        session = FakeSession(FakeResponse(200, b"v1", {"ETag": '"v1"'}), FakeResponse(200, b"v1", {"ETag": '"v1"'}))
+        fetch_drop_table(URL, cache_path, session)
+        forget_drop_table(cache_path)
+
+        assert fetch_drop_table(URL, cache_path, session) is True
+        assert session.requests[1] == {"Accept-Encoding": "gzip"}
+
+    def test_error_keeps_previous_cache(self, cache_path):
+        session = FakeSession(FakeResponse(200, b"v1", {"ETag": '"v1"'}), FakeResponse(503))
+        fetch_drop_table(URL, cache_path, session)
+
+        with pytest.raises(requests.HTTPError):
+            fetch_drop_table(URL, cache_path, session)
+        with open(cache_path, "rb") as f:
+            assert f.read() == b"v1"
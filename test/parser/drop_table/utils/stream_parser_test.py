@@ -0,0 +1,56 @@
+import os
+
+from bs4 import BeautifulSoup
+
+from parser.drop_table.utils.stream_parser import DropTablePage, Row, parse_sections
+
+PAGE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fixtures", "drop_table.html")
+
+
+def soup_sections(html):
+    """The (title, rows) pairs the whole-document BeautifulSoup parser used to read."""
+    body = BeautifulSoup(html, "html.parser").find("body")
+    for title, table in zip(body.find_all("h3")[2:], body.find_all("table")):
+        rows = tuple(
+            Row(
+                tuple((cell.name, cell.get_text().strip()) for cell in tr.find_all(["th", "td"])),
+                "blank-row" in (tr.get("class") or []),
+            )
+            for tr in table.find_all("tr")
+        )
+        yield title.get_text(), rows
+
+
+def read_page():
+    with open(PAGE, encoding="utf-8") as f:
+        return f.read()
+
+
+class TestStreamParser:
+    def test_matches_beautifulsoup(self):
+        html = read_page()
+
+        streamed = [(section.title, section.rows) for section in parse_sections([html])]
+
+        assert streamed == list(soup_sections(html))
+
+    def test_chunk_boundaries_do_not_matter(self):
+        html = read_page()
+
+        streamed = list(parse_sections(html[i:i + 7] for i in range(0, len(html), 7)))
+
+        assert streamed == list(parse_sections([html]))
+
+    def test_row_view(self):
+        section = next(parse_sections(["<table><tr><td></td><th>Stage 1</th></tr>"
+                                       "<tr class='x blank-row'><td> a &amp; <i>b</i> </td></tr></table>"]))
+
+        assert section.rows[0].headers == ["Stage 1"]
+        assert section.rows[0].data == [""]
+        assert section.rows[1] == Row((("td", "a & b"),), blank=True)
+
+    def test_page_date_and_sections_from_file(self):
+        page = DropTablePage(PAGE, chunk_size=16)
+
+        assert page.read_date() == BeautifulSoup(read_page(), "html.parser").find("h3").previous.strip()
+        assert [section.title for section in page.sections()][:2] == ["Missions:", "Relics:"]